@@ -0,0 +1,171 @@
+# code/basket_store.py
+"""
+Partitioned Parquet Basket Store
+Replaces the user_baskets.pkl / session_baskets.pkl checkpoints:
+
+    <store>/items.parquet               item_id -> milestone_name (shared vocabulary)
+    <store>/user/data_0.parquet         user_id, basket (SMALLINT[] item ids)
+    <store>/session/date=YYYY-MM-DD/    user_id, basket (one partition per day)
+
+Reads go through DuckDB, so a date range only opens the matching partitions
+and only the selected columns are decoded.
+"""
+
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from encoding import BitsetMatrix
+from utils import time_operation
+
+# Dictionary-encode one basket frame (registered as 'src') against 'items'
+ENCODE_QUERY = """
+    SELECT {keys}, list(items.item_id ORDER BY items.item_id) AS basket
+    FROM (
+        SELECT row_number() OVER () AS tid, {src_keys}, unnest(basket) AS milestone_name
+        FROM src
+    ) ev
+    JOIN items USING (milestone_name)
+    GROUP BY ev.tid, {keys}
+    ORDER BY {keys}
+"""
+
+
+def _source(store_dir, level):
+    store_dir = Path(store_dir)
+    if level == "session":
+        return f"read_parquet('{store_dir / 'session' / '*' / '*.parquet'}', hive_partitioning = true)"
+    if level == "user":
+        return f"read_parquet('{store_dir / 'user' / '*.parquet'}')"
+    raise ValueError(f"Unknown basket level: {level!r} (expected 'user' or 'session')")
+
+
+def _date_filter(start, end, column="date"):
+    # Predicates on the hive 'date' column prune whole partitions
+    clauses, params = [], []
+    if start is not None:
+        clauses.append(f"{column} >= ?::DATE")
+        params.append(str(start))
+    if end is not None:
+        clauses.append(f"{column} <= ?::DATE")
+        params.append(str(end))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def write_store(store_dir, df_user=None, df_session=None):
+    """
+    Writes the basket frames produced by 01_connection as a Parquet store with
+    one shared item vocabulary. Existing partitions are overwritten.
+    """
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect()
+
+    # 1. Shared vocabulary over both levels, sorted like TransactionEncoder
+    frames = {"user": df_user, "session": df_session}
+    names = set()
+    for df in frames.values():
+        if df is not None:
+            names.update(item for basket in df["basket"] for item in basket)
+    con.execute("CREATE TABLE items (item_id SMALLINT, milestone_name VARCHAR)")
+    con.executemany("INSERT INTO items VALUES (?, ?)", list(enumerate(sorted(names))))
+    con.execute(f"COPY items TO '{store_dir / 'items.parquet'}' (FORMAT PARQUET)")
+
+    # 2. Baskets as item-id lists; sessions partitioned by day
+    for level, df in frames.items():
+        if df is None:
+            continue
+        con.register("src", df)
+        if level == "session":
+            query = ENCODE_QUERY.format(src_keys="date::DATE AS date, user_id", keys="date, user_id")
+            con.execute(
+                f"COPY ({query}) TO '{store_dir / 'session'}' "
+                "(FORMAT PARQUET, PARTITION_BY (date), OVERWRITE_OR_IGNORE)"
+            )
+        else:
+            (store_dir / "user").mkdir(exist_ok=True)
+            query = ENCODE_QUERY.format(src_keys="user_id", keys="user_id")
+            con.execute(f"COPY ({query}) TO '{store_dir / 'user' / 'data_0.parquet'}' (FORMAT PARQUET)")
+        con.unregister("src")
+
+    con.close()
+    return store_dir
+
+
+def migrate_pickles(results_dir, store_dir=None):
+    """
+    One-off conversion of the existing pickle checkpoints into a store.
+    """
+    results_dir = Path(results_dir)
+    df_user = pd.read_pickle(results_dir / "user_baskets.pkl")
+    df_session = pd.read_pickle(results_dir / "session_baskets.pkl")
+    return write_store(store_dir or results_dir / "basket_store", df_user, df_session)
+
+
+def load_items(store_dir):
+    """
+    Returns the item vocabulary as an array indexed by item_id.
+    """
+    con = duckdb.connect()
+    path = Path(store_dir) / "items.parquet"
+    names = con.execute(f"SELECT milestone_name FROM read_parquet('{path}') ORDER BY item_id").fetchnumpy()
+    con.close()
+    return names["milestone_name"].astype(object)
+
+
+@time_operation
+def load_baskets(store_dir, level="session", start=None, end=None, columns=None):
+    """
+    Loads baskets (milestone names, as in the pickles) for one level and an
+    optional inclusive date range. 'columns' prunes the projection,
+    e.g. ['basket'] skips user_id/date entirely.
+    """
+    columns = columns or (["user_id", "date", "basket"] if level == "session" else ["user_id", "basket"])
+    where, params = _date_filter(start, end, "p.date") if level == "session" else ("", [])
+    vocab = Path(store_dir) / "items.parquet"
+    select = ", ".join(
+        "list_transform(p.basket, x -> v.vocab[x + 1]) AS basket" if c == "basket" else f"p.{c}"
+        for c in columns
+    )
+
+    con = duckdb.connect()
+    df = con.execute(
+        f"SELECT {select} FROM {_source(store_dir, level)} p, "
+        f"(SELECT list(milestone_name ORDER BY item_id) AS vocab FROM read_parquet('{vocab}')) v"
+        f"{where} ORDER BY {'p.date, ' if level == 'session' else ''}p.user_id",
+        params,
+    ).df()
+    con.close()
+    return df
+
+
+@time_operation
+def load_matrix(store_dir, level="session", start=None, end=None):
+    """
+    Loads one level straight into a BitsetMatrix from the stored item ids,
+    without materialising any Python lists of milestone names.
+    """
+    where, params = _date_filter(start, end) if level == "session" else ("", [])
+    order = "date, user_id" if level == "session" else "user_id"
+
+    con = duckdb.connect()
+    pairs = con.execute(
+        f"""
+        SELECT tid, unnest(basket)::INTEGER AS item_id
+        FROM (
+            SELECT row_number() OVER (ORDER BY {order}) - 1 AS tid, basket
+            FROM {_source(store_dir, level)}{where}
+        )
+        ORDER BY tid
+        """,
+        params,
+    ).fetchnumpy()
+    n_transactions = con.execute(f"SELECT count(*) FROM {_source(store_dir, level)}{where}", params).fetchone()[0]
+    con.close()
+
+    tids = pairs["tid"].astype(np.int64)
+    indptr = np.zeros(n_transactions + 1, dtype=np.int64)
+    np.cumsum(np.bincount(tids, minlength=n_transactions), out=indptr[1:])
+    return BitsetMatrix(load_items(store_dir), indptr, pairs["item_id"])
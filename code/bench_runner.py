@@ -0,0 +1,294 @@
+# code/bench_runner.py
+"""
+Benchmark Runner
+Repeated-trial measurement for the mining benchmarks: warmup runs are
+discarded, then every timed repeat records wall-clock and CPU time and the
+report gives median / IQR / min instead of one time_operation sample.
+Optional memory capture adds the tracemalloc allocation peak (in one extra,
+untimed run, since tracing slows the code down) and the peak RSS growth of
+one more untimed run in a forked child, so each record has its own peak.
+
+Run headless from the repo root, e.g.
+    python code/bench_runner.py harness --level session --supp 0.045 --conf 0.9 --repeat 5
+    python code/bench_runner.py stress --level user --start 0.23 --end 0.17 --step 0.01 --conf 0.5
+    python code/bench_runner.py scale --factors 1 10 100 --start 0.05 --end 0.03 --step 0.01
+('scale' mines synthetic baskets calibrated on the pickle; no database needed.)
+Results go to results/benchmarks/<name>_<git sha>.json and .csv together
+with the git SHA, dataset shape and all parameters, so runs can be compared
+across commits.
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter_ns, process_time_ns
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+BENCH_DIR = PROJECT_ROOT / "results" / "benchmarks"
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process so far in MB (lifetime
+    high-water mark), or None where the resource module is unavailable.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 ** 2 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _reset_rss_baseline():
+    # Hand freed heap pages back to the OS (glibc) so the run cannot reuse pages
+    # that are already resident, then restart the high-water mark (Linux >= 4.0)
+    try:
+        ctypes.CDLL(ctypes.util.find_library("c")).malloc_trim(0)
+    except (OSError, AttributeError, TypeError):
+        pass
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def run_peak_rss_mb(func, *args, **kwargs):
+    """
+    Peak RSS growth (MB) of ONE call of func, measured in a forked child whose
+    high-water mark is restarted before the call, so earlier runs in this
+    process cannot inflate it. None without fork/resource.
+    """
+    if resource is None or not hasattr(os, "fork"):
+        return None
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Child: report and leave without running the parent's exit handlers
+        try:
+            os.close(read_end)
+            _reset_rss_baseline()
+            before = peak_rss_mb()
+            func(*args, **kwargs)
+            os.write(write_end, str(peak_rss_mb() - before).encode())
+        finally:
+            os._exit(0)
+    os.close(write_end)
+    with os.fdopen(read_end) as f:
+        reply = f.read()
+    os.waitpid(pid, 0)
+    return float(reply) if reply else None
+
+
+def summarize(samples_ms):
+    """
+    Median, interquartile range and minimum of a list of timings (ms).
+    """
+    q1, median, q3 = np.percentile(samples_ms, [25, 50, 75])
+    return {"median": float(median), "iqr": float(q3 - q1), "min": float(np.min(samples_ms))}
+
+
+def measure(func, *args, warmup=0, repeat=1, memory=False, **kwargs):
+    """
+    Calls func(*args, **kwargs) 'warmup' + 'repeat' times.
+    Returns (result of the last call, stats dict); times are in ms like
+    time_operation, so repeat=1 / warmup=0 matches the single-shot numbers.
+    """
+    for _ in range(warmup):
+        func(*args, **kwargs)
+
+    wall, cpu = [], []
+    for _ in range(max(repeat, 1)):
+        start_wall, start_cpu = perf_counter_ns(), process_time_ns()
+        result = func(*args, **kwargs)
+        wall.append((perf_counter_ns() - start_wall) / 1_000_000)
+        cpu.append((process_time_ns() - start_cpu) / 1_000_000)
+
+    wall_stats, cpu_stats = summarize(wall), summarize(cpu)
+    stats = {
+        "Wall_MS": wall_stats["median"],
+        "Wall_IQR_MS": wall_stats["iqr"],
+        "Wall_Min_MS": wall_stats["min"],
+        "CPU_MS": cpu_stats["median"],
+        "Warmup": warmup,
+        "Repeat": len(wall),
+        "Samples_MS": wall,
+    }
+
+    if memory:
+        # Separate traced run: tracemalloc overhead must not leak into the timings
+        tracemalloc.start()
+        func(*args, **kwargs)
+        stats["Alloc_Peak_MB"] = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+        # And one untraced run in a child for this run's own RSS peak
+        stats["Peak_RSS_MB"] = run_peak_rss_mb(func, *args, **kwargs)
+
+    return result, stats
+
+
+def git_sha():
+    """
+    Current commit (short SHA, '+dirty' with uncommitted changes), or 'unknown'.
+    """
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return sha + ("+dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_metadata(df=None, **params):
+    """
+    Context stored with every result file: commit, machine, dataset shape, parameters.
+    """
+    meta = {
+        "git_sha": git_sha(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+    }
+    if df is not None:
+        meta["n_transactions"], meta["n_items"] = df.shape
+    meta["params"] = params
+    return meta
+
+
+def write_results(records, name, meta, out_dir=BENCH_DIR):
+    """
+    Writes <name>_<sha>.json (metadata + records) and a flat .csv with the
+    metadata repeated on every row. Non-scalar fields (rule frames) are dropped.
+    Returns the JSON path.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rows = [{k: v for k, v in r.items() if not isinstance(v, pd.DataFrame)} for r in records]
+    stem = out_dir / f"{name}_{meta['git_sha']}"
+
+    with open(stem.with_suffix(".json"), "w") as f:
+        json.dump({"meta": meta, "records": rows}, f, indent=2, default=str)
+
+    flat_meta = {k: v for k, v in meta.items() if k != "params"}
+    flat_meta.update({f"param_{k}": json.dumps(v) if isinstance(v, (list, tuple)) else v
+                      for k, v in meta["params"].items()})
+    df_rows = pd.DataFrame(rows).drop(columns="Samples_MS", errors="ignore")
+    df_rows.assign(**flat_meta).to_csv(stem.with_suffix(".csv"), index=False)
+    return stem.with_suffix(".json")
+
+
+def file_hash(path):
+    """
+    sha256 of a file's bytes.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_baskets(level, results_dir=PROJECT_ROOT / "results"):
+    return pd.read_pickle(Path(results_dir) / f"{level}_baskets.pkl")
+
+
+def load_encoded(level, results_dir=PROJECT_ROOT / "results"):
+    """
+    One-hot frame of the pickled user or session baskets (same columns as
+    the TransactionEncoder frames of 04 / 05), built from the shared
+    memory-mapped matrix file.
+    """
+    from matrix_file import shared_matrix
+
+    return shared_matrix(level, results_dir).to_frame()
+
+
+def main(argv=None):
+    from benchmarks import ALGORITHMS, benchmark_harness, run_scale_test, run_stress_test
+    from synthetic import calibrate
+
+    parser = argparse.ArgumentParser(description="Headless mining benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--level", choices=["user", "session"], default="session")
+    common.add_argument("--conf", type=float, default=0.8)
+    common.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    common.add_argument("--workers", type=int, default=1)
+    common.add_argument("--warmup", type=int, default=1)
+    common.add_argument("--repeat", type=int, default=5)
+    common.add_argument("--memory", action="store_true", help="capture tracemalloc / RSS peaks")
+    common.add_argument("--out", type=Path, default=BENCH_DIR)
+
+    stress_common = argparse.ArgumentParser(add_help=False)
+    stress_common.add_argument("--memory-mb", type=float, help="memory budget per mining run (bounded mode)")
+    stress_common.add_argument("--max-itemsets", type=int, help="itemset cap per mining run (bounded mode)")
+    stress_common.add_argument("--max-len", type=int, help="depth cap (bounded mode)")
+    stress_common.add_argument("--on-limit", choices=["stop", "raise_support"], default="stop")
+
+    harness = sub.add_parser("harness", parents=[common], help="one (support, confidence) point")
+    harness.add_argument("--supp", type=float, required=True)
+
+    stress = sub.add_parser("stress", parents=[common, stress_common], help="support sweep")
+    stress.add_argument("--start", type=float, required=True)
+    stress.add_argument("--end", type=float, required=True)
+    stress.add_argument("--step", type=float, required=True)
+
+    scale = sub.add_parser("scale", parents=[common, stress_common], help="data-size x support sweep on synthetic baskets")
+    scale.add_argument("--factors", type=float, nargs="+", default=[1, 10, 100])
+    scale.add_argument("--start", type=float, required=True)
+    scale.add_argument("--end", type=float, required=True)
+    scale.add_argument("--step", type=float, required=True)
+    scale.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    df = load_encoded(args.level) if args.command != "scale" else None
+    params = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items() if k != "out"}
+    timing = dict(warmup=args.warmup, repeat=args.repeat, memory=args.memory)
+    if args.command != "harness":
+        bounds = dict(memory_mb=args.memory_mb, max_itemsets=args.max_itemsets, max_len=args.max_len)
+        if any(v is not None for v in bounds.values()):
+            timing["limits"] = dict(bounds, on_limit=args.on_limit)
+
+    # 1. Run the benchmark with repeated trials
+    if args.command == "harness":
+        records = benchmark_harness(df, args.supp, args.conf, args.level.title(),
+                                    args.algorithms, args.workers, **timing)
+    elif args.command == "scale":
+        df_baskets = load_baskets(args.level)
+        df_scale = run_scale_test(calibrate(df_baskets["basket"]), len(df_baskets), args.factors,
+                                  args.start, args.end, args.step, args.conf, args.level.title(),
+                                  args.algorithms, args.workers, args.seed, **timing)
+        records = df_scale.attrs["records"]
+    else:
+        df_stress = run_stress_test(df, args.start, args.end, args.step, args.conf, args.level.title(),
+                                    args.algorithms, args.workers, **timing)
+        records = df_stress.attrs["records"]
+
+    # 2. Persist with the commit / dataset / parameter context
+    path = write_results(records, f"{args.command}_{args.level}", run_metadata(df, **params), args.out)
+    print(f"Results written to {path} (+ .csv)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+# code/benchmarks.py
+"""
+Benchmark Harness
+Shared Apriori / FP-Growth / Eclat timing functions used by
+04_fpg_comparison and 05_stress_test_benchmarks. "FP-Array" is FP-Growth on
+the array-backed FP-tree of fptree.py; "Apriori-Bits" is the level-wise
+bitset Apriori of apriori_bits.py.
+
+Timings go through bench_runner.measure: the defaults (warmup=0, repeat=1)
+reproduce the single-shot notebook numbers; headless runs
+(python code/bench_runner.py ...) use warmup / repeat and report the median.
+Rules are generated with vector_rules.generate_rules (same output as
+association_rules, computed on integer item masks).
+"""
+
+import pandas as pd
+from mlxtend.frequent_patterns import apriori, fpgrowth, association_rules
+
+from apriori_bits import apriori_bits
+from bench_runner import measure
+from bounded import bounded_mine
+from closed import basis_parts, maximal_itemsets, rules_from_basis
+from eclat import eclat
+from fptree import fpgrowth_arrays
+from parallel import parallel_eclat
+from synthetic import generate_matrix
+from vector_rules import generate_rules
+
+# Algorithm label -> mining function (mlxtend signature)
+ALGORITHMS = {
+    "Apriori": apriori,
+    "FP-Growth": fpgrowth,
+    "Eclat": eclat,
+    "FP-Array": fpgrowth_arrays,
+    "Apriori-Bits": apriori_bits,
+}
+
+# Algorithms with a multi-process mode (used when workers > 1)
+PARALLEL_ALGORITHMS = {
+    "Eclat": parallel_eclat,
+}
+
+
+def mine(name, df, supp, workers=1, warmup=0, repeat=1, memory=False, limits=None):
+    """
+    Runs one algorithm by label, switching to its parallel mode when
+    workers > 1 and one exists. Returns (itemsets, stats) where
+    stats['Wall_MS'] is the median of 'repeat' timed runs.
+    'limits' (bounded_mine keywords, e.g. {'memory_mb': 2000,
+    'max_itemsets': 500_000}) runs the serial algorithm under guardrails.
+    """
+    timing = dict(warmup=warmup, repeat=repeat, memory=memory)
+    if limits:
+        return measure(bounded_mine, df, min_support=supp, algorithm=ALGORITHMS[name], use_colnames=True,
+                       **limits, **timing)
+    if workers > 1 and name in PARALLEL_ALGORITHMS:
+        return measure(PARALLEL_ALGORITHMS[name], df, min_support=supp, use_colnames=True, workers=workers, **timing)
+    return measure(ALGORITHMS[name], df, min_support=supp, use_colnames=True, **timing)
+
+
+def stats_record(stats, unit="S"):
+    """
+    Spread / CPU / memory columns of a measure() result, in seconds.
+    """
+    record = {
+        f'Time_IQR_{unit}': stats['Wall_IQR_MS'] / 1000,
+        f'Time_Min_{unit}': stats['Wall_Min_MS'] / 1000,
+        f'CPU_{unit}': stats['CPU_MS'] / 1000,
+        'Warmup': stats['Warmup'],
+        'Repeat': stats['Repeat'],
+    }
+    for key in ('Alloc_Peak_MB', 'Peak_RSS_MB'):
+        if key in stats:
+            record[key] = stats[key]
+    return record
+
+
+def time_column(algorithm):
+    """
+    Stress-test column name for an algorithm label, e.g. 'FP-Growth' -> 'FPGrowth_S'.
+    """
+    return algorithm.replace("-", "") + "_S"
+
+
+def benchmark_harness(df, supp, conf, granularity, algorithms=None, workers=1,
+                      warmup=0, repeat=1, memory=False):
+    """
+    Times the full lifecycle (mining + rule generation) of every algorithm at
+    one (support, confidence) point and verifies the rule sets agree.
+    Time_S is the median over 'repeat' runs (after 'warmup' discarded runs).
+    """
+    algorithms = algorithms or list(ALGORITHMS)
+    results = []
+
+    for name in algorithms:
+        # We time mining + rule generation together to get the "Full Lifecycle" time
+        def lifecycle():
+            itemsets, _ = mine(name, df, supp, workers)
+            return generate_rules(itemsets, metric="confidence", min_threshold=conf)
+
+        rules, stats = measure(lifecycle, warmup=warmup, repeat=repeat, memory=memory)
+
+        results.append({
+            'Granularity': granularity,
+            'Algorithm': name,
+            'Workers': workers if name in PARALLEL_ALGORITHMS else 1,
+            'Time_S': stats['Wall_MS'] / 1000,  # Convert to seconds for the plot
+            **stats_record(stats),
+            'Rules_Count': len(rules),
+            'Rules_Ref': rules,
+        })
+
+    # Verification: Ensure Rule Identicality across every algorithm
+    match = len({r['Rules_Count'] for r in results}) == 1
+    for r in results:
+        r['Verified'] = match
+
+    return results
+
+
+def run_condensed_comparison(df, supp, conf, granularity):
+    """
+    Compares the full frequent-itemset table + association_rules with the
+    closed / maximal condensed representations and the non-redundant basis
+    at one (support, confidence) point. Itemsets / rule counts and times
+    per representation, with the rule frames in 'Rules_Ref'. Mine_S is
+    the mining step and Rules_S rule generation on its output only.
+    """
+    results = []
+
+    itemsets, mine_stats = measure(eclat, df, min_support=supp, use_colnames=True)
+    rules, rule_stats = measure(association_rules, itemsets, metric="confidence", min_threshold=conf)
+    results.append({'Granularity': granularity, 'Mode': 'Frequent', 'Itemsets': len(itemsets), 'Mine_S': mine_stats['Wall_MS'] / 1000,
+                    'Rules_S': rule_stats['Wall_MS'] / 1000, 'Rules_Count': len(rules), 'Rules_Ref': rules})
+
+    # Closed sets + generators are mined once; Rules_S times only the basis rules on them
+    (matrix, closed, generators), mine_stats = measure(basis_parts, df, min_support=supp)
+    basis, rule_stats = measure(rules_from_basis, matrix, closed, generators, min_confidence=conf)
+    results.append({'Granularity': granularity, 'Mode': 'Closed + generators', 'Itemsets': len(closed), 'Mine_S': mine_stats['Wall_MS'] / 1000,
+                    'Rules_S': rule_stats['Wall_MS'] / 1000, 'Rules_Count': len(basis), 'Rules_Ref': basis})
+
+    maximal, mine_stats = measure(maximal_itemsets, df, min_support=supp, use_colnames=True)
+    results.append({'Granularity': granularity, 'Mode': 'Maximal', 'Itemsets': len(maximal), 'Mine_S': mine_stats['Wall_MS'] / 1000,
+                    'Rules_S': None, 'Rules_Count': None, 'Rules_Ref': None})
+
+    for r in results:
+        r['Itemset_Ratio'] = r['Itemsets'] / len(itemsets) if len(itemsets) else None
+    return results
+
+
+def run_stress_test(df, start_supp, end_supp, step, conf, label, algorithms=None, workers=1,
+                    warmup=0, repeat=1, memory=False, limits=None):
+    """
+    Sweeps support from start_supp down to end_supp and records the median
+    mining time of every algorithm (one '<Algorithm>_S' column each).
+    One long-form record per (support, algorithm) with the spread, CPU and
+    memory figures is kept in df.attrs['records'].
+    With 'limits' (see mine) the sweep can enter the explosion zone: each
+    record carries the effective support and stop reason of bounded_mine.
+    """
+    algorithms = algorithms or list(ALGORITHMS)
+    stats = []
+    records = []
+    current_supp = start_supp
+
+    print(f"--- Stress Test: {label} Level ---")
+    while current_supp >= end_supp:
+        # Use a precision of 3 for float matching
+        supp_val = round(current_supp, 3)
+        row = {'Support': supp_val}
+
+        reference = None
+        for name in algorithms:
+            itemsets, run = mine(name, df, supp_val, workers, warmup, repeat, memory, limits)
+            row[time_column(name)] = run['Wall_MS'] / 1000
+            records.append({'Support': supp_val, 'Algorithm': name, 'Time_S': row[time_column(name)],
+                            **stats_record(run), 'Itemsets': len(itemsets),
+                            **itemsets.attrs.get('mining_report', {})})
+            if 'level_report' in itemsets.attrs:
+                # Candidates generated vs. frequent, per level (level-wise miners)
+                records[-1]['Level_Report'] = itemsets.attrs['level_report']
+            if reference is None:
+                reference = itemsets
+
+        # Note: Rule generation time is negligible compared to itemset mining in stress zones
+        row['Rule_Count'] = len(generate_rules(reference, metric="confidence", min_threshold=conf))
+
+        stats.append(row)
+        timings = " | ".join(f"{name}: {row[time_column(name)]:.3f}s" for name in algorithms)
+        report = reference.attrs.get('mining_report', {})
+        stopped = "" if report.get('Stop_Reason', 'complete') == 'complete' else (
+            f" | {algorithms[0]} stopped: {report['Stop_Reason']} (support {report['Effective_Support']:.4f})")
+        print(f"Support: {supp_val:.4f} | Rules: {row['Rule_Count']:>5} | {timings}{stopped}")
+
+        current_supp -= step
+
+    df_stress = pd.DataFrame(stats)
+    df_stress.attrs['records'] = records
+    return df_stress
+
+
+def run_scale_test(profile, base_transactions, factors, start_supp, end_supp, step, conf, label,
+                   algorithms=None, workers=1, seed=0, warmup=0, repeat=1, memory=False, limits=None):
+    """
+    Data-size sweep: for every factor, generates factor x base_transactions
+    synthetic baskets (synthetic.generate_matrix with 'profile', e.g. from
+    synthetic.calibrate) and runs the support sweep of run_stress_test on them.
+    Returns the stress frames stacked with 'Scale' / 'Transactions' columns.
+    """
+    frames, records = [], []
+
+    for factor in factors:
+        n = int(round(factor * base_transactions))
+        df = generate_matrix(n, seed=seed, **profile).to_frame()
+        df_stress = run_stress_test(df, start_supp, end_supp, step, conf, f"{label} x{factor} ({n} baskets)",
+                                    algorithms, workers, warmup, repeat, memory, limits)
+        frames.append(df_stress.assign(Scale=factor, Transactions=n))
+        records.extend({'Scale': factor, 'Transactions': n, **r} for r in df_stress.attrs['records'])
+
+    df_scale = pd.concat(frames, ignore_index=True)
+    df_scale = df_scale[['Scale', 'Transactions'] + [c for c in df_scale.columns if c not in ('Scale', 'Transactions')]]
+    df_scale.attrs['records'] = records
+    return df_scale
+
+
+def run_speedup_test(df, supp, worker_counts, label, algorithm="Eclat"):
+    """
+    Times one parallel-capable algorithm at a fixed support for each worker
+    count and reports the speedup against the single-process run.
+    """
+    stats = []
+
+    print(f"--- Speedup Test: {label} Level (Support {supp}) ---")
+    for workers in worker_counts:
+        itemsets, run = mine(algorithm, df, supp, workers)
+        time_ms = run['Wall_MS']
+        stats.append({
+            'Workers': workers,
+            'Time_S': time_ms / 1000,
+            'Itemsets': len(itemsets),
+        })
+        print(f"Workers: {workers:>2} | Itemsets: {len(itemsets):>6} | {algorithm}: {time_ms / 1000:.3f}s")
+
+    df_speedup = pd.DataFrame(stats)
+    serial = df_speedup.loc[df_speedup['Workers'] == 1, 'Time_S']
+    baseline = serial.iloc[0] if not serial.empty else df_speedup['Time_S'].iloc[0]
+    df_speedup['Speedup'] = baseline / df_speedup['Time_S']
+    return df_speedup
@@ -0,0 +1,207 @@
+# code/bounded.py
+"""
+Memory-Bounded Mining
+Guardrails for the low-support "explosion zone": mining runs under a memory
+budget (MB of resident memory above the level at the start), a maximum
+itemset count and a maximum depth. When a limit is hit, mining either
+
+- stops ("stop"): it returns the complete levels 1..k found before the limit,
+  which are downward closed, so association_rules still works on them; or
+- raises the support ("raise_support"): it retries at support * support_factor
+  until the run fits the limits.
+
+Eclat is checked as it mines (every recorded itemset goes through a guarded
+list). Other mlxtend-style algorithms cannot be interrupted, so they are run
+level by level (max_len = 1, 2, ...) with the checks in between.
+The frame's attrs['mining_report'] records the effective support and the
+reason for stopping.
+"""
+
+import pandas as pd
+
+from eclat import as_bitsets, counter_of, eclat, min_count_for, mine_class, root_class, to_frame
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+class MiningLimit(Exception):
+    """
+    Raised inside a mining run when a guardrail is hit.
+    """
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def current_rss_mb():
+    """
+    Resident memory of this process in MB (Linux /proc), falling back to the
+    peak RSS where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / 1024 ** 2
+    except (OSError, AttributeError):
+        if resource is None:
+            return 0.0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Guard:
+    """
+    Itemset-count and memory checks shared by all attempts of one run.
+    """
+
+    def __init__(self, max_itemsets=None, memory_mb=None, check_every=256):
+        self.max_itemsets = max_itemsets
+        self.memory_mb = memory_mb
+        self.check_every = check_every
+        self.peak_mb = 0.0
+        self.reset()
+
+    def reset(self):
+        # The memory budget applies per attempt, above the RSS at its start
+        self.baseline_mb = current_rss_mb()
+
+    def check(self, n_itemsets):
+        if self.max_itemsets is not None and n_itemsets > self.max_itemsets:
+            raise MiningLimit("max_itemsets")
+        if self.memory_mb is not None:
+            used = current_rss_mb() - self.baseline_mb
+            self.peak_mb = max(self.peak_mb, used)
+            if used > self.memory_mb:
+                raise MiningLimit("memory")
+
+
+class GuardedList(list):
+    """
+    Eclat output list that runs the guard as itemsets are appended.
+    """
+
+    def __init__(self, guard):
+        super().__init__()
+        self.guard = guard
+
+    def append(self, item):
+        super().append(item)
+        if len(self) % self.guard.check_every == 0 or (
+            self.guard.max_itemsets is not None and len(self) > self.guard.max_itemsets
+        ):
+            self.guard.check(len(self))
+
+
+def _guarded_eclat(matrix, min_support, max_len, guard, use_colnames, diffset_depth=3):
+    # eclat() with the guarded output list; raises MiningLimit
+    n = matrix.total_weight
+    min_count = min_count_for(min_support, n)
+    order, bits, counts = root_class(matrix, min_count)
+    found = GuardedList(guard)
+    mine_class((), order, bits, counts, False, min_count, max_len, diffset_depth, found, count=counter_of(matrix))
+    guard.check(len(found))
+    return to_frame(found, n, matrix.columns if use_colnames else None)
+
+
+def _run(data, algorithm, min_support, max_len, guard, use_colnames):
+    # One checked mining run at a fixed support and depth
+    try:
+        if algorithm is eclat:
+            return _guarded_eclat(data, min_support, max_len, guard, use_colnames)
+        itemsets = algorithm(data, min_support=min_support, use_colnames=use_colnames, max_len=max_len)
+    except MemoryError:
+        # A refused allocation (e.g. apriori's candidate cube) counts as the memory limit
+        raise MiningLimit("memory") from None
+    guard.check(len(itemsets))
+    return itemsets
+
+
+def _longest(itemsets):
+    # Size of the largest itemset in a frame (0 when empty)
+    return int(itemsets["itemsets"].map(len).max()) if len(itemsets) else 0
+
+
+def _complete_levels(data, algorithm, min_support, max_len, guard, use_colnames, done=None):
+    """
+    Mines max_len = 1, 2, ... until a level is empty, max_len is reached or
+    a guard trips. 'done' is (itemsets, k): levels 1..k already known at this
+    support, so mining resumes at k + 1 instead of level 1.
+    Returns (itemsets of the complete levels, number of levels, reason).
+    """
+    itemsets, level = done if done is not None else (pd.DataFrame({"support": [], "itemsets": []}), 0)
+    while not max_len or level < max_len:
+        try:
+            deeper = _run(data, algorithm, min_support, level + 1, guard, use_colnames)
+        except MiningLimit as limit:
+            return itemsets, level, limit.reason
+        itemsets, level = deeper, level + 1
+        # No itemset of this size means no larger ones either (downward closure)
+        if _longest(itemsets) < level:
+            return itemsets, level, "complete"
+    return itemsets, level, "max_len"
+
+
+def bounded_mine(df, min_support=0.5, algorithm=eclat, use_colnames=False, max_len=None,
+                 max_itemsets=None, memory_mb=None, on_limit="stop", support_factor=1.25,
+                 verbose=0) -> pd.DataFrame:
+    """
+    Mines frequent itemsets under a memory budget (memory_mb), an itemset cap
+    (max_itemsets) and a depth cap (max_len).
+
+    on_limit="stop" returns the complete levels found before the limit;
+    on_limit="raise_support" retries at min_support * support_factor.
+    The report is in df.attrs['mining_report'].
+    """
+    if on_limit not in ("stop", "raise_support"):
+        raise ValueError(f"on_limit must be 'stop' or 'raise_support', got {on_limit!r}")
+
+    guard = Guard(max_itemsets, memory_mb)
+    data = as_bitsets(df) if algorithm is eclat else df
+    support, attempts, done = min_support, 0, None
+
+    while True:
+        attempts += 1
+        try:
+            if algorithm is eclat:
+                # 1. Fast path: one guarded depth-first pass
+                itemsets = _run(data, algorithm, support, max_len, guard, use_colnames)
+                reason = "max_len" if max_len and _longest(itemsets) >= max_len else "complete"
+            else:
+                # 1. Level by level, checking between levels
+                itemsets, depth, reason = _complete_levels(data, algorithm, support, max_len, guard,
+                                                           use_colnames, done)
+                if reason not in ("complete", "max_len"):
+                    raise MiningLimit(reason)
+            break
+        except MiningLimit as limit:
+            guard.reset()
+            reason = limit.reason
+            if on_limit == "stop":
+                # 2. Keep the levels that completed before the limit (and the limit that stopped it)
+                if algorithm is eclat:
+                    itemsets, _, _ = _complete_levels(data, algorithm, support, max_len, guard, use_colnames)
+                break
+            # 3. Retry higher up, giving up once support reaches 1.0
+            if support >= 1.0:
+                raise
+            support = min(support * support_factor, 1.0)
+            if algorithm is not eclat:
+                # Levels complete at the lower support stay complete once filtered to the new one
+                done = (itemsets[itemsets["support"] >= support].reset_index(drop=True), depth)
+            if verbose:
+                print(f"Limit '{limit.reason}' hit: raising support to {support:.4f}")
+
+    itemsets.attrs["mining_report"] = {
+        "Requested_Support": min_support,
+        "Effective_Support": support,
+        "Stop_Reason": reason,
+        "Levels": _longest(itemsets),
+        "Itemsets": len(itemsets),
+        "Attempts": attempts,
+        "Peak_MB": guard.peak_mb if memory_mb is not None else None,
+    }
+    if verbose:
+        print(f"Bounded mining: {itemsets.attrs['mining_report']}")
+    return itemsets
@@ -0,0 +1,221 @@
+# code/closed.py
+"""
+Closed / Maximal Itemsets and the Non-Redundant Rule Basis
+Condensed alternatives to the full frequent-itemset table:
+
+- closed itemsets (no superset with the same support) are mined with LCM
+  (prefix-preserving closure extension, Uno et al.) over the packed bitsets,
+  so each closed set is produced exactly once and non-closed sets are never
+  enumerated;
+- maximal itemsets (no frequent superset) come out of the same search;
+- generators (minimal itemsets of each closure class) are mined level-wise.
+
+basis_rules() builds the generic basis G -> C \\ G (generator G, closed
+C > G): every association rule with confidence >= gamma follows from it,
+but it avoids the 2^k subset splits association_rules makes per itemset.
+basis_parts() (mining) and rules_from_basis() (rule generation) are its two
+halves, so the rule step can be timed on its own.
+Weighted matrices (compress.py) are counted with their row weights.
+"""
+
+import numpy as np
+import pandas as pd
+
+from eclat import _project, as_bitsets, counter_of, min_count_for, to_frame
+from encoding import popcount
+
+
+def _expand(ids, bits, counts, count, core, min_count, maximal, out, count_bits=popcount):
+    # One LCM node: rows of 'bits' are already ANDed with the node's tidset;
+    # 'count_bits' is eclat.counter_of(matrix) (weighted rows: no projection)
+    in_closure = counts == count
+    if in_closure.any() and (not maximal or in_closure.all()):
+        out.append((tuple(int(i) for i in ids[in_closure]), int(count)))
+
+    for k in np.flatnonzero(~in_closure & (ids > core)):
+        child = bits & bits[k]
+        child_counts = count_bits(child)
+
+        # Prefix-preserving test: the closure may not add items below ids[k]
+        closure = child_counts == counts[k]
+        if (closure & ~in_closure & (ids < ids[k])).any():
+            continue
+
+        keep = child_counts >= min_count
+        child = _project(child[keep]) if count_bits is popcount else child[keep]
+        _expand(ids[keep], child, child_counts[keep], counts[k], ids[k], min_count, maximal, out, count_bits)
+
+
+def mine_closed(matrix, min_count, maximal=False):
+    """
+    Returns (item-id tuple, count) pairs of every closed (or maximal)
+    itemset with count >= min_count.
+    """
+    counts = matrix.item_counts()
+    frequent = np.flatnonzero(counts >= min_count)
+    count_bits = counter_of(matrix)
+    out = []
+    if len(frequent) and matrix.total_weight >= min_count:
+        bits = matrix.bits[frequent]
+        _expand(frequent, _project(bits) if count_bits is popcount else bits, counts[frequent],
+                matrix.total_weight, -1, min_count, maximal, out, count_bits)
+    return out
+
+
+def closed_itemsets(df, min_support=0.5, use_colnames=False, verbose=0) -> pd.DataFrame:
+    """
+    Frequent closed itemsets in the mlxtend 'support' / 'itemsets' format.
+    """
+    matrix = as_bitsets(df)
+    found = mine_closed(matrix, min_count_for(min_support, matrix.total_weight))
+    if verbose:
+        print(f"LCM: {len(found)} closed itemsets")
+    return to_frame(found, matrix.total_weight, matrix.columns if use_colnames else None)
+
+
+def maximal_itemsets(df, min_support=0.5, use_colnames=False, verbose=0) -> pd.DataFrame:
+    """
+    Frequent maximal itemsets in the mlxtend 'support' / 'itemsets' format.
+    """
+    matrix = as_bitsets(df)
+    found = mine_closed(matrix, min_count_for(min_support, matrix.total_weight), maximal=True)
+    if verbose:
+        print(f"LCM: {len(found)} maximal itemsets")
+    return to_frame(found, matrix.total_weight, matrix.columns if use_colnames else None)
+
+
+def mine_generators(matrix, min_count):
+    """
+    Frequent generators (free sets: every immediate subset has a strictly
+    higher count), level by level. Returns (item-id tuple, count) pairs.
+    """
+    n = matrix.total_weight
+    counts = matrix.item_counts()
+    singles = np.flatnonzero((counts >= min_count) & (counts < n))
+    level = {(int(i),): (matrix.bits[i], int(counts[i])) for i in singles}
+    found = [(key, c) for key, (_, c) in level.items()]
+
+    while level:
+        # 1. Join free sets sharing their first k-1 items (prefix classes)
+        groups = {}
+        for key in sorted(level):
+            groups.setdefault(key[:-1], []).append(key)
+
+        deeper = {}
+        for members in groups.values():
+            for a, head in enumerate(members[:-1]):
+                rest = members[a + 1:]
+                head_bits, head_count = level[head]
+                child = head_bits & np.stack([level[key][0] for key in rest])
+                child_counts = matrix.count(child)
+
+                for key, bits, c in zip(rest, child, child_counts):
+                    if c < min_count:
+                        continue
+                    candidate = head + key[-1:]
+                    # 2. Free iff every immediate subset is free with a higher count
+                    subsets = [candidate[:j] + candidate[j + 1:] for j in range(len(candidate))]
+                    if all(s in level and level[s][1] > c for s in subsets):
+                        deeper[candidate] = (bits, int(c))
+
+        found.extend((key, c) for key, (_, c) in deeper.items())
+        level = deeper
+    return found
+
+
+def basis_parts(df, min_support=0.5):
+    """
+    Mining half of basis_rules: the frequent closed itemsets and generators.
+    Returns (BitsetMatrix, closed, generators) with (item-id tuple, count) pairs.
+    """
+    matrix = as_bitsets(df)
+    min_count = min_count_for(min_support, matrix.total_weight)
+    return matrix, mine_closed(matrix, min_count), mine_generators(matrix, min_count)
+
+
+def _rule_metrics(antecedent_support, consequent_support, support):
+    # association_rules metric columns (mlxtend 0.23 order) for rules without null values
+    confidence = support / antecedent_support if len(support) else support
+    leverage = support - antecedent_support * consequent_support
+    with np.errstate(divide="ignore", invalid="ignore"):
+        conviction = np.where(confidence < 1, (1 - consequent_support) / (1 - confidence), np.inf)
+        zhang = np.maximum(support * (1 - antecedent_support), antecedent_support * (consequent_support - support))
+        zhangs_metric = np.where(zhang == 0, 0, leverage / zhang)
+        certainty = np.where(consequent_support == 1, 0, (confidence - consequent_support) / (1 - consequent_support))
+    return {
+        "antecedent support": antecedent_support,
+        "consequent support": consequent_support,
+        "support": support,
+        "confidence": confidence,
+        "lift": confidence / consequent_support if len(support) else support,
+        "representativity": np.ones(len(support)),
+        "leverage": leverage,
+        "conviction": conviction,
+        "zhangs_metric": zhangs_metric,
+        "jaccard": support / (antecedent_support + consequent_support - support),
+        "certainty": certainty,
+        "kulczynski": (confidence + support / consequent_support) / 2 if len(support) else support,
+    }
+
+
+def rules_from_basis(matrix, closed, generators, min_confidence=0.8, use_colnames=True) -> pd.DataFrame:
+    """
+    Rule-generation half of basis_rules, on the output of basis_parts:
+    G -> C \\ G for every generator G and closed itemset C containing it
+    (C != G) with confidence >= min_confidence.
+    """
+    n = matrix.total_weight
+
+    # 1. Closed sets as packed item masks for vectorised superset tests
+    n_words = (matrix.shape[1] + 63) // 64
+
+    def mask(itemset):
+        words = np.zeros(n_words, dtype=np.uint64)
+        for i in itemset:
+            words[i >> 6] |= np.uint64(1) << np.uint64(i & 63)
+        return words
+
+    members = np.array([mask(itemset) for itemset, _ in closed]).reshape(len(closed), n_words)
+    closed_items = [itemset for itemset, _ in closed]
+    closed_counts = np.array([c for _, c in closed], dtype=np.int64)
+    closed_sizes = np.array([len(itemset) for itemset in closed_items])
+
+    consequent_counts = {}
+
+    def count_of(itemset):
+        if itemset not in consequent_counts:
+            consequent_counts[itemset] = matrix.itemset_count(itemset)
+        return consequent_counts[itemset]
+
+    rows = []
+    for generator, g_count in generators:
+        # 2. Closed supersets reachable with enough confidence
+        g_mask = mask(generator)
+        hits = np.flatnonzero(
+            ((members & g_mask) == g_mask).all(axis=1)
+            & (closed_sizes > len(generator))
+            & ((closed_counts / n) / (g_count / n) >= min_confidence)  # same float test as association_rules
+        )
+        for row in hits:
+            consequent = tuple(i for i in closed_items[row] if i not in generator)
+            rows.append((generator, consequent, g_count, count_of(consequent), int(closed_counts[row])))
+
+    label = (lambda itemset: frozenset(matrix.columns[list(itemset)])) if use_colnames else frozenset
+    metrics = _rule_metrics(np.array([r[2] for r in rows], dtype=float) / n,
+                            np.array([r[3] for r in rows], dtype=float) / n,
+                            np.array([r[4] for r in rows], dtype=float) / n)
+    return pd.DataFrame({
+        "antecedents": [label(r[0]) for r in rows],
+        "consequents": [label(r[1]) for r in rows],
+        **metrics,
+    })
+
+
+def basis_rules(df, min_support=0.5, min_confidence=0.8, use_colnames=True) -> pd.DataFrame:
+    """
+    Non-redundant rule basis: G -> C \\ G for every frequent generator G and
+    closed itemset C containing it (C != G) with confidence >= min_confidence.
+    Same columns as association_rules on data without null values
+    (representativity is therefore 1.0).
+    """
+    return rules_from_basis(*basis_parts(df, min_support), min_confidence, use_colnames)
@@ -0,0 +1,65 @@
+# code/compress.py
+"""
+Transaction Compression Pre-Pass
+Shrinks an encoded basket matrix before mining at a given minimum support:
+
+1. Items below min_support can never be part of a frequent itemset, so their
+   events are dropped (the vocabulary itself is kept, so item ids and column
+   names stay those of the input).
+2. Baskets that are identical after step 1 are merged into one row whose
+   weight is the number of baskets it stands for.
+
+The result is a weighted BitsetMatrix: eclat, apriori_bits, fpgrowth_arrays
+(and bounded / parallel eclat) count row weights and report supports relative
+to the original number of baskets, so they return exactly the itemsets of the
+uncompressed matrix for any support >= the one used to compress.
+"""
+
+import numpy as np
+
+from eclat import as_bitsets, min_count_for
+from encoding import BitsetMatrix, from_row_masks
+
+
+def compress_transactions(data, min_support=None) -> BitsetMatrix:
+    """
+    Weighted BitsetMatrix of the distinct baskets of 'data' (BitsetMatrix or
+    one-hot frame), restricted to the items frequent at 'min_support'
+    (all items when None). Mining it below 'min_support' is NOT exact.
+    """
+    matrix = as_bitsets(data)
+    weights = np.ones(matrix.n_transactions, dtype=np.int64) if matrix.weights is None else matrix.weights
+
+    # 1. Items that can still be frequent
+    keep = np.ones(len(matrix.columns), dtype=bool)
+    if min_support is not None and matrix.total_weight:
+        keep = matrix.item_counts() >= min_count_for(min_support, matrix.total_weight)
+
+    # 2. Distinct baskets and their summed weights
+    unique, inverse = np.unique(matrix.row_masks(keep), axis=0, return_inverse=True)
+    merged = np.bincount(inverse.ravel(), weights=weights, minlength=len(unique)).astype(np.int64)
+
+    # 3. Rows with weight != 1 first, so the weighted counts touch as few words as possible
+    order = np.argsort(merged == 1, kind="stable")
+    unique, merged = unique[order], merged[order]
+
+    return from_row_masks(matrix.columns, unique, merged)
+
+
+def compression_stats(original, compressed):
+    """
+    Size of a matrix before and after compress_transactions.
+    """
+    original = as_bitsets(original)
+    return {
+        "Baskets": original.total_weight,
+        "Rows_Before": original.n_transactions,
+        "Rows_After": compressed.n_transactions,
+        "Row_Ratio": original.n_transactions / max(compressed.n_transactions, 1),
+        "Events_Before": len(original.indices),
+        "Events_After": len(compressed.indices),
+        "Items_Kept": int(np.count_nonzero(compressed.item_counts())),
+        "Weighted_Rows": int(np.count_nonzero(compressed.weights != 1)),
+        "Heavy_Words": len(compressed.heavy_words),
+        "Words": compressed.n_words,
+    }
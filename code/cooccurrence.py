@@ -0,0 +1,119 @@
+# code/cooccurrence.py
+"""
+Milestone Co-occurrence Engine
+Computes the full pairwise count matrix of an encoded basket level as one
+sparse product C = X^T X (C[i, i] = item count, C[i, j] = baskets holding
+both), instead of the rawdataDec15 self-join in quick_reference.py.
+From C every pair's support, confidence and lift follow directly, and the
+frequent pairs seed level 2 of the mining engines. Weighted matrices
+(compress.py) give C = X^T W X, the counts of the uncompressed baskets.
+"""
+
+import numpy as np
+import pandas as pd
+
+from eclat import min_count_for
+
+
+def cooccurrence_counts(matrix):
+    """
+    Returns the dense (items x items) co-occurrence count matrix.
+    """
+    X = matrix.to_csr(np.int64)
+    if matrix.weights is not None:
+        weighted = X.copy()
+        weighted.data = np.repeat(matrix.weights, np.diff(matrix.indptr))
+        return (X.T @ weighted).toarray()
+    return (X.T @ X).toarray()
+
+
+def pair_metrics(matrix, min_support=0.0, counts=None) -> pd.DataFrame:
+    """
+    Support, confidence (both directions) and lift for every co-occurring
+    pair with support >= min_support.
+    """
+    C = cooccurrence_counts(matrix) if counts is None else counts
+    n = matrix.total_weight
+    i, j = np.triu_indices(len(C), k=1)
+    together = C[i, j]
+
+    keep = (together > 0) & (together >= min_count_for(min_support, n))
+    i, j, together = i[keep], j[keep], together[keep]
+    count_i, count_j = C[i, i], C[j, j]
+
+    return pd.DataFrame({
+        "milestone_1": matrix.columns[i],
+        "milestone_2": matrix.columns[j],
+        "count": together,
+        "support": together / n,
+        "confidence_1_2": together / count_i,
+        "confidence_2_1": together / count_j,
+        "lift": together * n / (count_i * count_j),
+    })
+
+
+def pair_users(session_matrix, session_users, i, j, chunk_size=256):
+    """
+    Distinct users with at least one session holding both milestones i[k]
+    and j[k]: the per-user OR of the session-level pair indicators
+    (COUNT(DISTINCT user_id) of the old self-join). 'session_users' gives
+    the user of every session row.
+    """
+    users = np.unique(np.asarray(session_users), return_inverse=True)[1].ravel()
+    order = np.argsort(users, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(users[order]) != 0]) if len(users) else users
+    n = session_matrix.n_transactions
+    found = np.zeros(len(i), dtype=np.int64)
+    if not len(starts):
+        return found
+
+    for start in range(0, len(i), chunk_size):
+        # 1. Session tidsets of a chunk of pairs, one bool column per session
+        both = session_matrix.bits[i[start:start + chunk_size]] & session_matrix.bits[j[start:start + chunk_size]]
+        rows = np.unpackbits(np.ascontiguousarray(both).view(np.uint8), axis=1, bitorder="little")[:, :n]
+        # 2. OR over each user's sessions, then count the users
+        found[start:start + chunk_size] = np.logical_or.reduceat(rows[:, order], starts, axis=1).sum(axis=1)
+    return found
+
+
+def cooccurrence_table(session_matrix, session_users, top=None) -> pd.DataFrame:
+    """
+    Pairs ranked by the number of sessions that contain both milestones,
+    with the number of distinct users who had such a session alongside
+    (see pair_users; counted for the returned pairs only).
+    """
+    sessions = cooccurrence_counts(session_matrix)
+    i, j = np.triu_indices(len(sessions), k=1)
+    keep = sessions[i, j] > 0
+    i, j = i[keep], j[keep]
+
+    ranked = np.lexsort((session_matrix.columns[j], session_matrix.columns[i], -sessions[i, j]))
+    ranked = ranked[:top] if top else ranked
+    i, j = i[ranked], j[ranked]
+    return pd.DataFrame({
+        "milestone_1": session_matrix.columns[i],
+        "milestone_2": session_matrix.columns[j],
+        "sessions_together": sessions[i, j],
+        "users_together": pair_users(session_matrix, session_users, i, j),
+    })
+
+
+def level2_itemsets(matrix, min_support, use_colnames=True, counts=None) -> pd.DataFrame:
+    """
+    Frequent 1- and 2-itemsets straight from C, in the mlxtend
+    'support'/'itemsets' frame format.
+    """
+    C = cooccurrence_counts(matrix) if counts is None else counts
+    n = matrix.total_weight
+    min_count = min_count_for(min_support, n)
+    label = (lambda k: matrix.columns[k]) if use_colnames else int
+
+    singles = np.flatnonzero(np.diag(C) >= min_count)
+    i, j = np.triu_indices(len(C), k=1)
+    pairs = C[i, j] >= min_count
+
+    return pd.DataFrame({
+        "support": np.concatenate([np.diag(C)[singles], C[i, j][pairs]]) / n,
+        "itemsets": [frozenset([label(k)]) for k in singles]
+        + [frozenset([label(a), label(b)]) for a, b in zip(i[pairs], j[pairs])],
+    })
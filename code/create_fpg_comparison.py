@@ -2,7 +2,7 @@
 import json
 from pathlib import Path
 
-notebook_path = Path("/home/bhavik/Dropbox/edu/smu/winter/data_mining/a3_association/5580-dm-a3-association/code/04_fpg_comparison.ipynb")
+notebook_path = Path(__file__).resolve().parent / "04_fpg_comparison.ipynb"
 
 def create_markdown_cell(source):
     return {
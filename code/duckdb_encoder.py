@@ -0,0 +1,82 @@
+# code/duckdb_encoder.py
+"""
+DuckDB-Side Basket Encoder
+Builds baskets and the one-hot encoding in a single DuckDB query against
+mysql_db.rawdataDec15 instead of pulling list_distinct(list(milestone_name))
+into pandas, pickling it and re-encoding with TransactionEncoder.
+
+DuckDB maps milestone names to dense integer ids and emits sorted
+(transaction_id, item_id) pairs; they come back as NumPy columns and are packed
+straight into a BitsetMatrix, so no per-basket Python lists are created.
+"""
+
+import numpy as np
+import pandas as pd
+
+from encoding import BitsetMatrix
+
+LEVEL_KEYS = {
+    "user": ["user_id"],
+    "session": ["user_id", "date"],
+}
+
+# Distinct (keys, milestone) events of the baskets that 01_connection keeps
+# (HAVING len(basket) > 1), numbered in a deterministic transaction order.
+EVENTS_QUERY = """
+    CREATE OR REPLACE TEMP TABLE _basket_events AS
+    WITH events AS (
+        SELECT DISTINCT {keys}, milestone_name
+        FROM {table}
+        WHERE milestone_name IS NOT NULL
+    ),
+    baskets AS (
+        SELECT {keys}, row_number() OVER (ORDER BY {keys}) - 1 AS tid
+        FROM events
+        GROUP BY {keys}
+        HAVING count(*) > 1
+    )
+    SELECT baskets.tid, {event_keys}, events.milestone_name
+    FROM events
+    JOIN baskets USING ({keys})
+"""
+
+ITEMS_QUERY = """
+    CREATE OR REPLACE TEMP TABLE _basket_items AS
+    SELECT milestone_name, (dense_rank() OVER (ORDER BY milestone_name) - 1)::INTEGER AS item_id
+    FROM (SELECT DISTINCT milestone_name FROM _basket_events)
+"""
+
+PAIRS_QUERY = """
+    SELECT e.tid, i.item_id
+    FROM _basket_events e
+    JOIN _basket_items i USING (milestone_name)
+    ORDER BY e.tid, i.item_id
+"""
+
+
+def encode_from_db(con, level="session", table="mysql_db.rawdataDec15"):
+    """
+    Encodes one basket level directly from the events table.
+    Returns (BitsetMatrix, keys frame with one row per transaction).
+    """
+    keys = ", ".join(LEVEL_KEYS[level])
+    event_keys = ", ".join(f"events.{k}" for k in LEVEL_KEYS[level])
+
+    # 1. One scan of the source table; everything else runs on the temp table
+    con.execute(EVENTS_QUERY.format(keys=keys, event_keys=event_keys, table=table))
+    con.execute(ITEMS_QUERY)
+
+    # 2. Columnar results: vocabulary, (tid, item_id) pairs, transaction keys
+    columns = con.execute("SELECT milestone_name FROM _basket_items ORDER BY item_id").fetchnumpy()["milestone_name"]
+    pairs = con.execute(PAIRS_QUERY).fetchnumpy()
+    df_keys = pd.DataFrame(con.execute(
+        f"SELECT DISTINCT tid, {keys} FROM _basket_events ORDER BY tid"
+    ).fetchnumpy()).drop(columns="tid")
+
+    con.execute("DROP TABLE _basket_events; DROP TABLE _basket_items;")
+
+    # 3. CSR offsets from the sorted transaction ids
+    n_transactions = len(df_keys)
+    indptr = np.zeros(n_transactions + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pairs["tid"].astype(np.int64), minlength=n_transactions), out=indptr[1:])
+    return BitsetMatrix(columns.astype(object), indptr, pairs["item_id"]), df_keys
@@ -0,0 +1,169 @@
+# code/eclat.py
+"""
+Vertical Mining Backend (Eclat / dEclat)
+Depth-first search over prefix equivalence classes using NumPy-packed
+tid-bitsets. Supports are popcounts of bitwise ANDs; from 'diffset_depth'
+onwards each class switches to diffsets (tids of the prefix MISSING from the
+extension), which shrink as the itemsets get longer.
+
+Weighted matrices (compress.py) are mined the same way with 'count' summing
+the row weights of a tid-bitset instead of popcounting it.
+
+Drop-in replacement for mlxtend apriori/fpgrowth: same signature and the same
+'support' / 'itemsets' frame, so association_rules keeps working.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from encoding import BitsetMatrix, encode_frame, popcount
+
+
+def min_count_for(min_support, n_transactions):
+    """
+    Smallest absolute count c with c / n >= min_support (mlxtend semantics).
+    """
+    count = max(math.ceil(min_support * n_transactions), 0)
+    while count > 0 and (count - 1) / n_transactions >= min_support:
+        count -= 1
+    while count / n_transactions < min_support:
+        count += 1
+    return count
+
+
+def as_bitsets(data):
+    """
+    Accepts a BitsetMatrix or a one-hot frame and returns a BitsetMatrix.
+    """
+    return data if isinstance(data, BitsetMatrix) else encode_frame(data)
+
+
+def _project(bits):
+    # Drop words that are zero for every member of the class
+    live = np.flatnonzero(np.bitwise_or.reduce(bits, axis=0))
+    return bits[:, live]
+
+
+def extend_class(bits, counts, i, diff, switch, candidates=slice(None), count=popcount):
+    """
+    Builds the child class of member i against members i+1..k
+    (optionally only the 'candidates' among them).
+    Returns (child_bits, child_counts, child_is_diffset).
+    """
+    head, rest = bits[i], bits[i + 1:][candidates]
+    if diff:
+        # d(PXY) = d(PY) \ d(PX)
+        child = rest & ~head
+        return child, counts[i] - count(child), True
+    if switch:
+        # d(PXY) = t(PX) \ t(PY)
+        child = head & ~rest
+        return child, counts[i] - count(child), True
+    # t(PXY) = t(PX) & t(PY)
+    child = head & rest
+    return child, count(child), False
+
+
+def mine_class(prefix, items, bits, counts, diff, min_count, max_len, diffset_depth, out,
+               pair_counts=None, count=popcount):
+    """
+    Recursively mines one prefix equivalence class, appending
+    (itemset tuple, count) pairs to 'out'.
+    """
+    for i in range(len(items)):
+        mine_member(prefix, items, bits, counts, diff, i, min_count, max_len, diffset_depth, out,
+                    pair_counts, count)
+
+
+def mine_member(prefix, items, bits, counts, diff, i, min_count, max_len, diffset_depth, out,
+                pair_counts=None, count=popcount):
+    """
+    Mines the subtree rooted at member i of a class (prefix + items[i] and
+    all of its extensions with items[i+1:]).
+    'pair_counts' (co-occurrence matrix) seeds the root level: only pairs
+    already known to be frequent are intersected.
+    'count' is the tid-bitset counter (BitsetMatrix.count for weighted
+    matrices, whose words must then keep their positions: no projection).
+    """
+    itemset = prefix + (int(items[i]),)
+    out.append((itemset, int(counts[i])))
+
+    if (max_len and len(itemset) >= max_len) or i + 1 == len(items):
+        return
+
+    rest = items[i + 1:]
+    candidates = slice(None)
+    if pair_counts is not None and not prefix:
+        candidates = np.flatnonzero(pair_counts[items[i], rest] >= min_count)
+        if not len(candidates):
+            return
+
+    switch = len(itemset) + 1 >= diffset_depth
+    child, child_counts, child_diff = extend_class(bits, counts, i, diff, switch, candidates, count)
+    keep = child_counts >= min_count
+    if keep.any():
+        child = _project(child[keep]) if count is popcount else child[keep]
+        mine_class(
+            itemset, rest[candidates][keep], child, child_counts[keep],
+            child_diff, min_count, max_len, diffset_depth, out, count=count
+        )
+
+
+def to_frame(found, n_transactions, columns=None) -> pd.DataFrame:
+    """
+    Converts (itemset tuple, count) pairs to the mlxtend 'support'/'itemsets' frame.
+    """
+    found = sorted(found, key=lambda pair: (len(pair[0]), sorted(pair[0])))
+    support = np.array([count for _, count in found], dtype=float) / n_transactions
+    if columns is not None:
+        itemsets = [frozenset(columns[i] for i in itemset) for itemset, _ in found]
+    else:
+        itemsets = [frozenset(itemset) for itemset, _ in found]
+    return pd.DataFrame({"support": support, "itemsets": itemsets})
+
+
+def root_class(matrix, min_count):
+    """
+    Returns (items, bits, counts) of the frequent 1-itemsets, ordered by
+    ascending support so the largest classes hold the rarest tid-bitsets.
+    """
+    counts = matrix.item_counts()
+    frequent = np.flatnonzero(counts >= min_count)
+    order = frequent[np.argsort(counts[frequent], kind="stable")]
+    bits = matrix.bits[order]
+    return order, _project(bits) if matrix.weights is None else bits, counts[order]
+
+
+def counter_of(matrix):
+    """
+    Tid-bitset counter for mine_class: popcount, or the weighted count.
+    """
+    return popcount if matrix.weights is None else matrix.count
+
+
+def eclat(df, min_support=0.5, use_colnames=False, max_len=None, verbose=0, diffset_depth=3,
+          pair_counts=None):
+    """
+    Mines frequent itemsets with Eclat, switching to dEclat diffsets for
+    itemsets of length >= diffset_depth. Pass the co-occurrence matrix
+    (cooccurrence.cooccurrence_counts) as 'pair_counts' to seed level 2.
+    """
+    matrix = as_bitsets(df)
+    n = matrix.total_weight
+    if n == 0:
+        return pd.DataFrame({"support": [], "itemsets": []})
+    min_count = min_count_for(min_support, n)
+
+    # 1. Frequent 1-itemsets, ordered by ascending support (smaller classes)
+    order, bits, counts = root_class(matrix, min_count)
+
+    # 2. Depth-first search from the root class
+    found = []
+    mine_class((), order, bits, counts, False, min_count, max_len, diffset_depth, found, pair_counts,
+               counter_of(matrix))
+    if verbose:
+        print(f"Eclat: {len(found)} frequent itemsets (min_count={min_count})")
+
+    return to_frame(found, n, matrix.columns if use_colnames else None)
@@ -0,0 +1,218 @@
+# code/encoding.py
+"""
+Sparse Bitset Transaction Encoder
+Turns the 'basket' list column into a compact representation instead of the
+dense pd.DataFrame(te_ary, columns=te.columns_) of Python bools:
+
+- CSR arrays (indptr / indices): one int32 per event.
+- Packed vertical bitsets: one uint64 row per milestone, one bit per basket,
+  so the support of any itemset is popcount(AND of its rows).
+"""
+
+import numpy as np
+import pandas as pd
+
+WORD_BITS = 64
+
+
+def popcount(words):
+    """
+    Counts set bits along the last axis of a uint64 array.
+    """
+    return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+
+
+class BitsetMatrix:
+    """
+    Encoded baskets: item vocabulary + CSR tid-lists + packed item bitsets.
+    Column order matches TransactionEncoder (sorted milestone names).
+
+    Optional integer 'weights' make each row stand for that many identical
+    baskets (see compress.py); counts are then weighted sums and supports
+    are relative to total_weight.
+    """
+
+    def __init__(self, columns, indptr, indices, weights=None, bits=None):
+        self.columns = np.asarray(columns, dtype=object)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.n_transactions = len(self.indptr) - 1
+        self.n_words = (self.n_transactions + WORD_BITS - 1) // WORD_BITS
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.int64)
+        # Pre-packed 'bits' (e.g. memory-mapped by matrix_file.py) are used as they are
+        self.bits = self._pack() if bits is None else bits
+        if self.weights is not None:
+            self._split_words()
+
+    @property
+    def total_weight(self):
+        """
+        Number of baskets represented (n_transactions when unweighted).
+        """
+        return self.n_transactions if self.weights is None else int(self.weights.sum())
+
+    def _split_words(self):
+        # Words whose 64 rows all have weight 1 are counted with a plain popcount,
+        # the others ('heavy' words) bit by bit against the row weights
+        padded = np.ones(self.n_words * WORD_BITS, dtype=np.int64)
+        padded[:self.n_transactions] = self.weights
+        heavy = (padded.reshape(self.n_words, WORD_BITS) != 1).any(axis=1)
+        self.light_words = np.flatnonzero(~heavy)
+        self.heavy_words = np.flatnonzero(heavy)
+        self.heavy_weights = padded.reshape(self.n_words, WORD_BITS)[heavy].ravel()
+
+    def count(self, words):
+        """
+        Support count of packed tid-sets along the last axis: popcount, or
+        the sum of the row weights when the matrix is weighted.
+        """
+        if self.weights is None:
+            return popcount(words)
+        light = popcount(words[..., self.light_words])
+        heavy = np.ascontiguousarray(words[..., self.heavy_words]).view(np.uint8)
+        heavy = np.unpackbits(heavy, axis=-1, bitorder="little")
+        return light + heavy @ self.heavy_weights
+
+    @property
+    def shape(self):
+        return self.n_transactions, len(self.columns)
+
+    def _pack(self):
+        # Row id of every event, then scatter one bit per (item, basket)
+        rows = np.repeat(np.arange(self.n_transactions, dtype=np.int64), np.diff(self.indptr))
+        bits = np.zeros((len(self.columns), self.n_words), dtype=np.uint64)
+        shifts = np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64))
+        np.bitwise_or.at(bits, (self.indices, rows >> 6), shifts)
+        return bits
+
+    def row_masks(self, keep=None):
+        """
+        Horizontal layout: one packed item mask per basket
+        (only the items where the boolean 'keep' is True).
+        """
+        rows = np.repeat(np.arange(self.n_transactions, dtype=np.int64), np.diff(self.indptr))
+        items = self.indices.astype(np.int64)
+        if keep is not None:
+            rows, items = rows[keep[items]], items[keep[items]]
+        masks = np.zeros((self.n_transactions, (len(self.columns) + WORD_BITS - 1) // WORD_BITS), dtype=np.uint64)
+        np.bitwise_or.at(masks, (rows, items >> 6), np.left_shift(np.uint64(1), (items & 63).astype(np.uint64)))
+        return masks
+
+    def item_counts(self):
+        """
+        Returns the absolute support count of every item.
+        """
+        return self.count(self.bits)
+
+    def item_support(self) -> pd.Series:
+        return pd.Series(self.item_counts() / self.total_weight, index=self.columns)
+
+    def itemset_count(self, item_ids):
+        """
+        Returns the number of baskets containing every item in item_ids.
+        """
+        acc = np.bitwise_and.reduce(self.bits[list(item_ids)], axis=0)
+        return int(self.count(acc))
+
+    def baskets(self):
+        """
+        Decodes back to a list of milestone-name lists.
+        """
+        return [
+            self.columns[self.indices[start:end]].tolist()
+            for start, end in zip(self.indptr[:-1], self.indptr[1:])
+        ]
+
+    def memory_usage(self):
+        """
+        Returns the footprint in bytes of each representation.
+        """
+        return {
+            "bitsets": self.bits.nbytes,
+            "csr": self.indptr.nbytes + self.indices.nbytes,
+            "dense_bool": self.n_transactions * len(self.columns),
+            "events": len(self.indices),
+        }
+
+    def _require_unweighted(self, name):
+        # One-hot frames have no row weights: mlxtend would mine the merged rows as single baskets
+        if self.weights is not None:
+            raise ValueError(f"{name}() would drop the row weights of a compressed matrix; "
+                             "mine it with a weight-aware engine (eclat, apriori_bits, fpgrowth_arrays)")
+
+    def to_csr(self, dtype=bool):
+        from scipy.sparse import csr_matrix
+
+        data = np.ones(len(self.indices), dtype=dtype)
+        return csr_matrix((data, self.indices, self.indptr), shape=self.shape)
+
+    def to_sparse_frame(self) -> pd.DataFrame:
+        """
+        Sparse boolean frame accepted directly by mlxtend apriori/fpgrowth.
+        """
+        self._require_unweighted("to_sparse_frame")
+        frame = pd.DataFrame.sparse.from_spmatrix(self.to_csr(np.uint8), columns=list(self.columns))
+        return frame.astype(pd.SparseDtype(bool, False))
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Dense boolean frame, identical to the TransactionEncoder output.
+        """
+        self._require_unweighted("to_frame")
+        return pd.DataFrame(self.to_csr().toarray(), columns=list(self.columns))
+
+
+def encode_baskets(baskets, columns=None) -> BitsetMatrix:
+    """
+    Encodes an iterable of baskets into a BitsetMatrix.
+    Work is proportional to the number of events, not baskets x milestones.
+    Pass 'columns' to reuse an existing vocabulary (unknown items are dropped).
+    """
+    baskets = list(baskets)
+    lengths = np.fromiter((len(b) for b in baskets), dtype=np.int64, count=len(baskets))
+    flat = np.array([item for b in baskets for item in b], dtype=object)
+    rows = np.repeat(np.arange(len(baskets), dtype=np.int64), lengths)
+
+    # 1. Vocabulary: sorted distinct items -> dense integer ids
+    if columns is None:
+        columns, codes = np.unique(flat.astype(str), return_inverse=True)
+    else:
+        columns = np.asarray(columns, dtype=object)
+        lookup = {item: i for i, item in enumerate(columns)}
+        codes = np.fromiter((lookup.get(item, -1) for item in flat), dtype=np.int64, count=len(flat))
+        known = codes >= 0
+        rows, codes = rows[known], codes[known]
+
+    # 2. Drop duplicate items inside a basket, keep (row, item) order
+    keys = np.unique(rows * len(columns) + codes)
+    rows, codes = keys // max(len(columns), 1), keys % max(len(columns), 1)
+
+    indptr = np.zeros(len(baskets) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(baskets)), out=indptr[1:])
+    return BitsetMatrix(columns, indptr, codes)
+
+
+def from_row_masks(columns, masks, weights=None) -> BitsetMatrix:
+    """
+    BitsetMatrix of packed per-basket item masks (see BitsetMatrix.row_masks).
+    """
+    bits = np.unpackbits(np.ascontiguousarray(masks).view(np.uint8), axis=1, bitorder="little")
+    rows, indices = np.nonzero(bits[:, :len(columns)])
+    indptr = np.zeros(len(masks) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(masks)), out=indptr[1:])
+    return BitsetMatrix(columns, indptr, indices, weights)
+
+
+def encode_frame(df) -> BitsetMatrix:
+    """
+    Encodes an existing one-hot frame (dense or sparse bool) into a BitsetMatrix.
+    """
+    if hasattr(df, "sparse"):
+        csr = df.sparse.to_coo().tocsr()
+        csr.sort_indices()
+        indptr, indices = csr.indptr, csr.indices
+    else:
+        rows, indices = np.nonzero(df.to_numpy(dtype=bool))
+        indptr = np.zeros(len(df) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(df)), out=indptr[1:])
+    return BitsetMatrix(df.columns, indptr, indices)
@@ -0,0 +1,227 @@
+# code/fptree.py
+"""
+Array-Backed FP-Growth
+FP-Growth with the FP-tree held in flat NumPy arrays (item, count, parent)
+instead of one Python object per node:
+
+- A tree is built one depth at a time: the transactions' items at depth d
+  (in descending-support order) are merged under their depth d-1 node with
+  one np.unique over (parent, item) keys, so shared prefixes become one node.
+- The node-links are an item-sorted index (header_ptr / header_nodes): all
+  nodes of an item are one contiguous slice.
+- A conditional pattern base is projected by walking the parent array of
+  all of an item's nodes at once, one depth per step.
+- Every tree lives in one FPArena. A conditional tree is written above its
+  parent tree and the space is released when its recursion returns, so the
+  node arrays are reused across conditional levels instead of reallocated.
+
+fpgrowth_arrays() takes the mlxtend arguments and returns the same itemsets
+and supports as mlxtend fpgrowth (rows in eclat.to_frame order).
+"""
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from eclat import as_bitsets, min_count_for, to_frame
+
+
+class FPArena:
+    """
+    Growable node arrays shared by a tree and all its conditional trees.
+    """
+
+    def __init__(self, capacity=1024):
+        self.item = np.empty(capacity, dtype=np.int64)
+        self.count = np.empty(capacity, dtype=np.int64)
+        self.parent = np.empty(capacity, dtype=np.int64)
+        self.top = 0
+
+    def reserve(self, n):
+        # Doubles the arrays until n more nodes fit; node indices stay valid
+        capacity = len(self.item)
+        if self.top + n > capacity:
+            while self.top + n > capacity:
+                capacity *= 2
+            for name in ("item", "count", "parent"):
+                grown = np.empty(capacity, dtype=np.int64)
+                grown[:self.top] = getattr(self, name)[:self.top]
+                setattr(self, name, grown)
+
+
+class FPTree:
+    """
+    One tree in the arena: nodes [start, end) plus its header (node-links).
+    """
+
+    def __init__(self, arena, start, end):
+        self.arena, self.start, self.end = arena, start, end
+        items = arena.item[start:end]
+        order = np.argsort(items, kind="stable")
+        self.header_nodes = start + order
+        self.header_items, first = np.unique(items[order], return_index=True)
+        self.header_ptr = np.r_[first, len(order)]
+        self.totals = np.add.reduceat(arena.count[self.header_nodes], first) if len(first) else first
+
+    def nodes_of(self, k):
+        return self.header_nodes[self.header_ptr[k]:self.header_ptr[k + 1]]
+
+    def is_path(self):
+        # Single chain: one node per item and every node the child of the previous one
+        parents = self.arena.parent[self.start + 1:self.end]
+        return len(self.header_items) == self.end - self.start and bool(
+            (parents == np.arange(self.start, self.end - 1)).all()
+        )
+
+
+def build_tree(arena, indptr, items, weights):
+    """
+    Writes the FP-tree of CSR transactions (items in tree order, i.e.
+    ascending rank id) with integer weights into the arena.
+    """
+    n_items = int(items.max()) + 1 if len(items) else 1
+    lengths = np.diff(indptr)
+    start = arena.top
+    arena.reserve(len(items))
+    node_of = np.full(len(lengths), -1, dtype=np.int64)  # -1 is the root
+
+    for depth in range(int(lengths.max()) if len(lengths) else 0):
+        # 1. Transactions with an item at this depth, keyed by (parent node, item)
+        rows = np.flatnonzero(lengths > depth)
+        item = items[indptr[rows] + depth]
+        keys = (node_of[rows] + 1) * n_items + item
+        unique, inverse = np.unique(keys, return_inverse=True)
+
+        # 2. One node per distinct key, counts summed over the merged transactions
+        ids = arena.top + np.arange(len(unique))
+        arena.item[ids] = unique % n_items
+        arena.parent[ids] = unique // n_items - 1
+        arena.count[ids] = np.bincount(inverse, weights=weights[rows], minlength=len(unique))
+        arena.top += len(unique)
+        node_of[rows] = ids[inverse]
+
+    return FPTree(arena, start, arena.top)
+
+
+def conditional_base(tree, nodes, min_count):
+    """
+    Prefix paths of 'nodes' as CSR transactions (items in tree order, only
+    the items frequent within the base) with the nodes' counts as weights.
+    """
+    arena = tree.arena
+    path, current = np.arange(len(nodes)), arena.parent[nodes]
+    path_ids, path_items = [], []
+    while len(current):
+        # Walk every path one step towards the root at once
+        live = current >= 0
+        path, current = path[live], current[live]
+        path_ids.append(path)
+        path_items.append(arena.item[current])
+        current = arena.parent[current]
+
+    weights = arena.count[nodes]
+    if not path_ids:
+        return np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64), weights[:0]
+    path_ids, path_items = np.concatenate(path_ids), np.concatenate(path_items)
+
+    # Drop items that are infrequent in the base, then order each path by item rank
+    totals = np.bincount(path_items, weights=weights[path_ids])
+    keep = totals[path_items] >= min_count
+    path_ids, path_items = path_ids[keep], path_items[keep]
+    order = np.lexsort((path_items, path_ids))
+    path_ids, path_items = path_ids[order], path_items[order]
+
+    used, counts = np.unique(path_ids, return_counts=True)
+    indptr = np.zeros(len(used) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return indptr, path_items, weights[used]
+
+
+def mine_path(items, counts, suffix, max_len, out):
+    """
+    Every combination of a single path's items, with the count of its deepest node.
+    """
+    items, counts = [int(i) for i in items], [int(c) for c in counts]
+    longest = len(items) if not max_len else min(len(items), max_len - len(suffix))
+    for size in range(1, longest + 1):
+        for picks in combinations(range(len(items)), size):
+            out.append((suffix + tuple(items[p] for p in picks), counts[picks[-1]]))
+
+
+def mine_tree(tree, suffix, min_count, max_len, out):
+    """
+    Appends (rank-id tuple, count) of every frequent itemset of the tree
+    extended with 'suffix'.
+    """
+    if max_len and len(suffix) >= max_len:
+        return
+    arena = tree.arena
+
+    if tree.is_path():
+        mine_path(arena.item[tree.start:tree.end], arena.count[tree.start:tree.end], suffix, max_len, out)
+        return
+
+    # Least frequent item first, as in FP-Growth
+    for k in range(len(tree.header_items) - 1, -1, -1):
+        itemset = suffix + (int(tree.header_items[k]),)
+        out.append((itemset, int(tree.totals[k])))
+        if max_len and len(itemset) >= max_len:
+            continue
+        indptr, items, weights = conditional_base(tree, tree.nodes_of(k), min_count)
+        if not len(items):
+            continue
+        if len(weights) == 1:
+            # One prefix path: no tree needed
+            mine_path(items, np.full(len(items), weights[0]), itemset, max_len, out)
+            continue
+        top = arena.top
+        mine_tree(build_tree(arena, indptr, items, weights), itemset, min_count, max_len, out)
+        arena.top = top  # release the conditional tree's nodes
+
+
+def fpgrowth_arrays(df, min_support=0.5, use_colnames=False, max_len=None, verbose=0,
+                    weights=None) -> pd.DataFrame:
+    """
+    FP-Growth on an array-backed FP-tree (mlxtend fpgrowth signature).
+    'weights' are optional integer transaction multiplicities (default: the
+    weights of a compressed BitsetMatrix).
+    """
+    matrix = as_bitsets(df)
+    n = matrix.n_transactions
+    if weights is None:
+        weights = matrix.weights if matrix.weights is not None else np.ones(n, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.int64)
+    total = int(weights.sum())
+    if total == 0:
+        return pd.DataFrame({"support": [], "itemsets": []})
+    min_count = min_count_for(min_support, total)
+
+    # 1. Frequent items, ranked by descending support (rank 0 = most frequent)
+    counts = np.bincount(matrix.indices, weights=np.repeat(weights, np.diff(matrix.indptr)),
+                         minlength=matrix.shape[1])
+    frequent = np.flatnonzero(counts >= min_count)
+    ranked = frequent[np.argsort(-counts[frequent], kind="stable")]
+    rank = np.full(matrix.shape[1], -1, dtype=np.int64)
+    rank[ranked] = np.arange(len(ranked))
+
+    # 2. Transactions as rank-sorted CSR, infrequent items dropped
+    rows = np.repeat(np.arange(n), np.diff(matrix.indptr))
+    item_ranks = rank[matrix.indices]
+    keep = item_ranks >= 0
+    rows, item_ranks = rows[keep], item_ranks[keep]
+    order = np.lexsort((item_ranks, rows))
+    rows, item_ranks = rows[order], item_ranks[order]
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+
+    # 3. Root tree and the recursive conditional mining in one arena
+    arena = FPArena(max(len(item_ranks), 1024))
+    tree = build_tree(arena, indptr, item_ranks, weights)
+    found = []
+    mine_tree(tree, (), min_count, max_len, found)
+    if verbose:
+        print(f"FP-Array: {tree.end} root nodes, {len(found)} frequent itemsets (min_count={min_count})")
+
+    found = [(tuple(int(ranked[r]) for r in itemset), count) for itemset, count in found]
+    return to_frame(found, total, matrix.columns if use_colnames else None)
@@ -0,0 +1,252 @@
+# code/incremental.py
+"""
+Incremental Session-Level Mining
+Keeps the support count of every frequent itemset plus its negative border
+(minimal infrequent itemsets) so that new days of rawdataDec15 events only
+cost a count over the NEW sessions:
+
+1. Every tracked itemset (frequent + border) is counted on the increment.
+2. If no border itemset became frequent, the frequent set is exact.
+3. Otherwise only the candidates that were never tracked (supersets of the
+   promoted itemsets) are counted over the full encoded matrix.
+
+The encoded matrix lives in buffers with spare capacity (doubled when full),
+so a batch only packs its own rows instead of repacking every basket.
+"""
+
+import pickle
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from mlxtend.frequent_patterns import association_rules
+
+from eclat import min_count_for
+from encoding import WORD_BITS, BitsetMatrix, encode_baskets
+
+# Same basket definition as 01_connection, restricted to unseen dates
+NEW_SESSIONS_QUERY = """
+    SELECT user_id, date, list_distinct(list(milestone_name)) as basket
+    FROM {table}
+    WHERE ? IS NULL OR date > ?
+    GROUP BY user_id, date
+    HAVING len(basket) > 1
+    ORDER BY date, user_id
+"""
+
+
+def count_itemsets(matrix, itemsets, chunk_size=4096):
+    """
+    Counts a list of same-or-mixed length item-id tuples on a BitsetMatrix
+    with one batched AND + popcount (weighted count on a compressed matrix)
+    per (length, chunk).
+    """
+    counts = np.zeros(len(itemsets), dtype=np.int64)
+    by_len = {}
+    for pos, itemset in enumerate(itemsets):
+        by_len.setdefault(len(itemset), []).append(pos)
+
+    for positions in by_len.values():
+        ids = np.array([itemsets[p] for p in positions], dtype=np.int64)
+        for start in range(0, len(positions), chunk_size):
+            block = ids[start:start + chunk_size]
+            acc = np.bitwise_and.reduce(matrix.bits[block], axis=1)
+            counts[positions[start:start + chunk_size]] = matrix.count(acc)
+    return counts
+
+
+def _reserve(buffer, shape):
+    # 'buffer' if it already holds 'shape', else a copy with each short axis doubled
+    if all(need <= have for need, have in zip(shape, buffer.shape)):
+        return buffer
+    grown = np.zeros([have if need <= have else max(need, 2 * have)
+                      for need, have in zip(shape, buffer.shape)], dtype=buffer.dtype)
+    grown[tuple(slice(0, have) for have in buffer.shape)] = buffer
+    return grown
+
+
+def apriori_gen(frequent_k):
+    """
+    Joins sorted k-itemsets sharing a (k-1)-prefix and keeps the candidates
+    whose every k-subset is frequent.
+    """
+    frequent_k = sorted(frequent_k)
+    lookup = set(frequent_k)
+    candidates = []
+    for i, a in enumerate(frequent_k):
+        for b in frequent_k[i + 1:]:
+            if a[:-1] != b[:-1]:
+                break
+            cand = a + (b[-1],)
+            if all(sub in lookup for sub in combinations(cand, len(cand) - 1)):
+                candidates.append(cand)
+    return candidates
+
+
+class IncrementalMiner:
+    """
+    Frequent itemsets + negative border with absolute counts, updated one
+    batch of sessions (e.g. one new date partition) at a time.
+    """
+
+    def __init__(self, min_support, max_len=None):
+        self.min_support = min_support
+        self.max_len = max_len
+        self.matrix = encode_baskets([])
+        self.counts = {}        # item-id tuple -> absolute count (frequent + border)
+        self.last_date = None   # high-water mark of ingested session dates
+        # Backing buffers of self.matrix, with spare capacity for later batches
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._bits = np.zeros((0, 0), dtype=np.uint64)
+
+    @property
+    def n_transactions(self):
+        return self.matrix.total_weight
+
+    @property
+    def min_count(self):
+        return min_count_for(self.min_support, max(self.n_transactions, 1))
+
+    def _append(self, baskets):
+        # Append-only vocabulary so existing item ids stay valid
+        columns = list(self.matrix.columns)
+        known = set(columns)
+        columns += sorted({item for b in baskets for item in b} - known)
+        new = encode_baskets(baskets, columns=columns)
+
+        # 1. CSR arrays: copy the batch behind the existing events
+        n, nnz = self.matrix.n_transactions, int(self._indptr[self.matrix.n_transactions])
+        rows, events = n + new.n_transactions, nnz + len(new.indices)
+        self._indptr = _reserve(self._indptr, (rows + 1,))
+        self._indptr[n + 1:rows + 1] = new.indptr[1:] + nnz
+        self._indices = _reserve(self._indices, (events,))
+        self._indices[nnz:events] = new.indices
+
+        # 2. Bitsets: set only the bits of the new rows (offset n, not word-aligned)
+        n_words = (rows + WORD_BITS - 1) // WORD_BITS
+        self._bits = _reserve(self._bits, (len(columns), n_words))
+        row_ids = n + np.repeat(np.arange(new.n_transactions, dtype=np.int64), np.diff(new.indptr))
+        np.bitwise_or.at(self._bits, (new.indices, row_ids >> 6),
+                         np.left_shift(np.uint64(1), (row_ids & 63).astype(np.uint64)))
+
+        self.matrix = BitsetMatrix(columns, self._indptr[:rows + 1], self._indices[:events],
+                                   bits=self._bits[:len(columns), :n_words])
+        return new
+
+    def _close_border(self, fresh):
+        """
+        Counts the untracked candidates after an update, level-wise from the
+        newly frequent itemsets 'fresh': a candidate that was never tracked
+        has at least one newly frequent subset, so the rest of the frequent
+        set is not joined again. Returns the number of candidates counted.
+        """
+        min_count = self.min_count
+        frequent = set(self.frequent_ids())
+        fresh = set(fresh)
+        counted = 0
+        level = [(i,) for i in range(len(self.matrix.columns)) if (i,) not in self.counts]
+        k = 1
+        while True:
+            if level:
+                for itemset, count in zip(level, count_itemsets(self.matrix, level)):
+                    self.counts[itemset] = int(count)
+                    if count >= min_count:
+                        frequent.add(itemset)
+                        fresh.add(itemset)
+                counted += len(level)
+            if (self.max_len and k >= self.max_len) or not any(len(s) >= k for s in fresh):
+                break
+            # Extend each newly frequent k-itemset by one frequent item
+            items = sorted(s[0] for s in frequent if len(s) == 1)
+            level = set()
+            for itemset in (s for s in fresh if len(s) == k):
+                for item in items:
+                    if item in itemset:
+                        continue
+                    cand = tuple(sorted(itemset + (item,)))
+                    if cand not in self.counts and all(sub in frequent for sub in combinations(cand, k)):
+                        level.add(cand)
+            level = sorted(level)
+            k += 1
+        return counted
+
+    def _prune(self):
+        # Keep frequent itemsets and minimal infrequent ones (the border)
+        min_count = self.min_count
+        frequent = {s for s, c in self.counts.items() if c >= min_count}
+        self.counts = {
+            s: c for s, c in self.counts.items()
+            if s in frequent or all(sub in frequent for sub in combinations(s, len(s) - 1) if sub)
+        }
+
+    def update(self, baskets, last_date=None):
+        """
+        Adds a batch of new baskets and returns a summary of the update.
+        """
+        baskets = [list(b) for b in baskets]
+        old_frequent = set(self.frequent_ids())
+        old_tracked = set(self.counts)
+
+        # 1. Count every tracked itemset on the increment only
+        new = self._append(baskets)
+        tracked = list(self.counts)
+        for itemset, count in zip(tracked, count_itemsets(new, tracked)):
+            self.counts[itemset] += int(count)
+
+        # 2. Border itemsets that crossed min_count force a localized re-mine
+        frequent = set(self.frequent_ids())
+        promoted = (frequent - old_frequent) & old_tracked
+        remined = self._close_border(promoted)
+        if old_frequent - frequent:
+            # Demoted itemsets leave non-minimal infrequent supersets behind
+            self._prune()
+        if last_date is not None:
+            self.last_date = last_date
+
+        return {
+            "New_Transactions": len(baskets),
+            "Transactions": self.n_transactions,
+            "Frequent": len(self.frequent_ids()),
+            "Border": len(self.counts) - len(self.frequent_ids()),
+            "Promoted": len(promoted),
+            "Demoted": len(old_frequent - frequent),
+            "Remined_Candidates": remined,
+        }
+
+    def ingest_dates(self, con, table="mysql_db.rawdataDec15"):
+        """
+        Pulls only the session baskets dated after the high-water mark from
+        the DuckDB connection (MySQL attach or local snapshot) and updates.
+        """
+        query = NEW_SESSIONS_QUERY.format(table=table)
+        df_new = con.execute(query, [self.last_date, self.last_date]).df()
+        last_date = df_new["date"].max() if not df_new.empty else self.last_date
+        return self.update(df_new["basket"], last_date=last_date)
+
+    def frequent_ids(self):
+        min_count = self.min_count
+        return [s for s, c in self.counts.items() if c >= min_count]
+
+    def itemsets(self) -> pd.DataFrame:
+        """
+        Current frequent itemsets in the mlxtend 'support'/'itemsets' format.
+        """
+        found = sorted(self.frequent_ids(), key=lambda s: (len(s), s))
+        columns = self.matrix.columns
+        return pd.DataFrame({
+            "support": [self.counts[s] / self.n_transactions for s in found],
+            "itemsets": [frozenset(columns[i] for i in s) for s in found],
+        })
+
+    def rules(self, min_confidence=0.8) -> pd.DataFrame:
+        return association_rules(self.itemsets(), metric="confidence", min_threshold=min_confidence)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
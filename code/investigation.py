@@ -4,27 +4,14 @@ This script investigates the structure of rawdataDec15 and features tables
 to understand their relationship and how to join them.
 """
 
-import os
-import duckdb
 import pandas as pd
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from profiler import load_profile, row_count
+from snapshot import connect
 
-# Build the DuckDB-specific MySQL connection string
-mysql_config = (
-    f"host={os.getenv('DB_HOST')} "
-    f"user={os.getenv('DB_USER')} "
-    f"password={os.getenv('DB_PWD')} "
-    f"database={os.getenv('DB_NAME')} "
-    f"port={os.getenv('DB_PORT')}"
-)
-
-# Initialize DuckDB and attach MySQL
-con = duckdb.connect()
-con.execute("INSTALL mysql; LOAD mysql;")
-con.execute(f"ATTACH '{mysql_config}' AS mysql_db (TYPE MYSQL);")
+# Attach rawdataDec15/features as 'mysql_db' from the local snapshot
+# (refresh with snapshot.refresh_snapshot(); connect(remote=True) hits MySQL)
+con = connect()
 
 print("=" * 80)
 print("INVESTIGATION: Schema and Relationship Analysis")
@@ -36,7 +23,7 @@ print("-" * 80)
 rawdata_schema = con.execute("""
     SELECT column_name, data_type, is_nullable
     FROM information_schema.columns
-    WHERE table_schema = 'mysql_db' 
+    WHERE table_catalog = 'mysql_db' 
     AND table_name = 'rawdataDec15'
     ORDER BY ordinal_position
 """).df()
@@ -48,7 +35,7 @@ print("-" * 80)
 features_schema = con.execute("""
     SELECT column_name, data_type, is_nullable
     FROM information_schema.columns
-    WHERE table_schema = 'mysql_db' 
+    WHERE table_catalog = 'mysql_db' 
     AND table_name = 'features'
     ORDER BY ordinal_position
 """).df()
@@ -81,8 +68,8 @@ print(f"Common columns: {common_cols if common_cols else 'None found'}")
 # 6. Check row counts
 print("\n6. Row counts:")
 print("-" * 80)
-rawdata_count = con.execute("SELECT COUNT(*) as count FROM mysql_db.rawdataDec15").fetchone()[0]
-features_count = con.execute("SELECT COUNT(*) as count FROM mysql_db.features").fetchone()[0]
+rawdata_count = row_count(load_profile(con, "rawdataDec15"))
+features_count = row_count(load_profile(con, "features"))
 print(f"rawdataDec15: {rawdata_count:,} rows")
 print(f"features: {features_count:,} rows")
 
@@ -3,27 +3,13 @@ Join Query Examples
 Demonstrates various ways to join rawdataDec15 and features tables
 """
 
-import os
-import duckdb
 import pandas as pd
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Build the DuckDB-specific MySQL connection string
-mysql_config = (
-    f"host={os.getenv('DB_HOST')} "
-    f"user={os.getenv('DB_USER')} "
-    f"password={os.getenv('DB_PWD')} "
-    f"database={os.getenv('DB_NAME')} "
-    f"port={os.getenv('DB_PORT')}"
-)
-
-# Initialize DuckDB and attach MySQL
-con = duckdb.connect()
-con.execute("INSTALL mysql; LOAD mysql;")
-con.execute(f"ATTACH '{mysql_config}' AS mysql_db (TYPE MYSQL);")
+
+from snapshot import connect
+
+# Attach rawdataDec15/features as 'mysql_db' from the local snapshot
+# (refresh with snapshot.refresh_snapshot(); connect(remote=True) hits MySQL)
+con = connect()
 
 print("=" * 80)
 print("JOIN QUERY EXAMPLES")
@@ -0,0 +1,87 @@
+# code/levels.py
+"""
+Shared-Vocabulary Basket Levels
+Builds the user and session matrices from ONE session-granularity scan
+instead of two GROUP BY extractions encoded by separate TransactionEncoders:
+
+- every (user_id, date) session is encoded once, so both levels share one
+  sorted item vocabulary (item ids mean the same milestone at both levels);
+- a user basket is the union of that user's sessions, i.e. a grouped
+  bitwise OR of the session item masks over user_id;
+- the HAVING len(basket) > 1 filter of 01_connection is applied to each
+  level afterwards. The scan must therefore include 1-item sessions, since
+  they can still add items to a user basket.
+"""
+
+import numpy as np
+import pandas as pd
+
+from encoding import encode_baskets, from_row_masks
+
+# All sessions, no length filter (derive_levels applies it per level)
+SESSIONS_QUERY = """
+    SELECT user_id, date, list_distinct(list(milestone_name)) as basket
+    FROM {table}
+    WHERE milestone_name IS NOT NULL
+    GROUP BY user_id, date
+    ORDER BY date, user_id
+"""
+
+
+def group_or(masks, groups):
+    """
+    Grouped bitwise OR of packed row masks.
+    Returns (group labels in sorted order, one OR-ed mask per group).
+    """
+    labels, inverse = np.unique(groups, return_inverse=True)
+    if not len(labels):
+        return labels, masks[:0]
+    order = np.argsort(inverse, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(inverse[order]) != 0])
+    return labels, np.bitwise_or.reduceat(masks[order], starts, axis=0)
+
+
+def derive_levels(sessions, keys, min_len=2):
+    """
+    Session and user levels of an unfiltered session BitsetMatrix and its
+    keys frame (user_id, date). Returns {level: (BitsetMatrix, keys frame)}
+    with the same columns at both levels.
+    """
+    masks = sessions.row_masks()
+
+    # 1. Users: OR of their session masks
+    users, user_masks = group_or(masks, keys["user_id"].to_numpy())
+
+    # 2. Basket-length filter per level
+    levels = {}
+    for level, level_masks, level_keys in [
+        ("user", user_masks, pd.DataFrame({"user_id": users})),
+        ("session", masks, keys.reset_index(drop=True)),
+    ]:
+        keep = np.bitwise_count(level_masks).sum(axis=1) >= min_len
+        levels[level] = (from_row_masks(sessions.columns, level_masks[keep]),
+                         level_keys[keep].reset_index(drop=True))
+    return levels
+
+
+def encode_levels(df_sessions, min_len=2):
+    """
+    derive_levels() of a frame of all sessions (user_id, date, basket).
+    """
+    matrix = encode_baskets(df_sessions["basket"])
+    return derive_levels(matrix, df_sessions[["user_id", "date"]], min_len)
+
+
+def encode_levels_from_db(con, table="mysql_db.rawdataDec15", min_len=2):
+    """
+    encode_levels() straight from the events table: one GROUP BY scan.
+    """
+    return encode_levels(con.execute(SESSIONS_QUERY.format(table=table)).df(), min_len)
+
+
+def basket_frames(levels):
+    """
+    Decodes derive_levels() output to the 01_connection pickle layout
+    (keys + 'basket' list column).
+    """
+    return {level: keys.assign(basket=matrix.baskets()) for level, (matrix, keys) in levels.items()}
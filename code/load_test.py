@@ -0,0 +1,144 @@
+# code/load_test.py
+"""
+Recommendation Service Load Test
+Replays session prefixes from results/session_baskets.pkl against a running
+rec_service.py with N concurrent keep-alive clients, optionally triggering
+rule reloads mid-run, and reports client-side p50/p99, throughput, failed
+requests and the server's own /stats.
+
+Run from the repo root with the service up, e.g.
+    python code/rec_service.py --rules results/apriori_session_elite_rules.csv &
+    python code/load_test.py --requests 20000 --concurrency 64 --reloads 3
+Results go to results/benchmarks/load_test_<git sha>.json and .csv.
+"""
+
+import argparse
+import asyncio
+import json
+from time import perf_counter
+
+import numpy as np
+
+from bench_runner import BENCH_DIR, load_baskets, run_metadata, write_results
+
+
+def session_prefixes(baskets, n, max_len=5, seed=0):
+    """
+    n "current sessions": the first 1..max_len milestones of random session baskets.
+    """
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(baskets), n)
+    return [list(baskets[b])[:int(rng.integers(1, max_len + 1))] for b in picks]
+
+
+async def call(reader, writer, method, path, payload=None):
+    # One keep-alive HTTP/1.1 request; returns (status, decoded JSON body)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    return status, json.loads(await reader.readexactly(int(headers["content-length"])))
+
+
+async def request_once(host, port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return await call(reader, writer, method, path, payload)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, sessions, concurrency=32, top=5, reloads=0):
+    """
+    Sends every session once over 'concurrency' connections; 'reloads'
+    POST /reload calls are spread over the run. Returns the client record.
+    """
+    pending = iter(enumerate(sessions))
+    latencies = np.zeros(len(sessions))
+    failures, versions = [], set()
+
+    async def client():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i, milestones in pending:
+                start = perf_counter()
+                try:
+                    status, response = await call(reader, writer, "POST", "/recommend",
+                                                  {"milestones": milestones, "top": top})
+                except (ConnectionError, asyncio.IncompleteReadError) as error:
+                    failures.append(str(error))
+                    reader, writer = await asyncio.open_connection(host, port)
+                    continue
+                latencies[i] = (perf_counter() - start) * 1000
+                if status != 200:
+                    failures.append(response.get("error", status))
+                else:
+                    versions.add(response["rules_version"])
+        finally:
+            writer.close()
+
+    async def reloader():
+        # Reload after every len(sessions) / (reloads + 1) answered requests
+        for k in range(1, reloads + 1):
+            while np.count_nonzero(latencies) < k * len(sessions) // (reloads + 1):
+                await asyncio.sleep(0.01)
+            await request_once(host, port, "POST", "/reload")
+
+    start = perf_counter()
+    reload_task = asyncio.ensure_future(reloader())
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = perf_counter() - start
+    await reload_task
+
+    done = latencies[latencies > 0]
+    p50, p99 = np.percentile(done, [50, 99]) if len(done) else (np.nan, np.nan)
+    return {
+        "Requests": len(sessions),
+        "Failed": len(failures),
+        "Concurrency": concurrency,
+        "Throughput_RPS": len(done) / elapsed,
+        "Client_P50_MS": float(p50),
+        "Client_P99_MS": float(p99),
+        "Rules_Versions_Seen": len(versions),
+    }
+
+
+async def load_test(host, port, sessions, concurrency, top, reloads):
+    await request_once(host, port, "GET", "/health")
+    record = await run_load(host, port, sessions, concurrency, top, reloads)
+    _, stats = await request_once(host, port, "GET", "/stats")
+    record.update({f"Server_{k}": v for k, v in stats.items()})
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for rec_service.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8580)
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--reloads", type=int, default=0, help="POST /reload calls during the run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=str(BENCH_DIR))
+    args = parser.parse_args(argv)
+
+    sessions = session_prefixes(load_baskets("session")["basket"], args.requests, seed=args.seed)
+    record = asyncio.run(load_test(args.host, args.port, sessions, args.concurrency, args.top, args.reloads))
+    for key, value in record.items():
+        print(f"{key:>24}: {value}")
+
+    params = {k: v for k, v in vars(args).items() if k != "out"}
+    path = write_results([record], "load_test", run_metadata(**params), args.out)
+    print(f"Results written to {path} (+ .csv)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# code/matrix_file.py
+"""
+Memory-Mapped Encoded Matrix File
+Persists a BitsetMatrix once as a single binary file, so notebooks, the
+pipeline and benchmark workers open the encoding instead of re-running
+TransactionEncoder on the pickles in every kernel:
+
+    8 bytes   magic b"BSMATRX1"
+    8 bytes   header length (little-endian uint64)
+    header    JSON: vocabulary, source hash, dtype/shape/offset per array
+    arrays    bits, indptr, indices (and weights), each 64-byte aligned
+
+open_matrix() maps the arrays read-only with np.memmap (no copy, pages are
+shared between processes). Files live in results/encoded/ and are named by
+the sha256 of the source basket pickle, so a changed pickle gets a new file
+and stale versions are removed.
+
+Run from the repo root to (re)build both levels:
+    python code/matrix_file.py
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+
+from bench_runner import PROJECT_ROOT, file_hash, load_baskets
+from encoding import BitsetMatrix, encode_baskets
+
+MAGIC = b"BSMATRX1"
+ALIGN = 64
+RESULTS_DIR = PROJECT_ROOT / "results"
+MATRIX_DIR = RESULTS_DIR / "encoded"
+
+
+def save_matrix(matrix, path, source_hash=""):
+    """
+    Writes the matrix to 'path' (atomically, via a .tmp file).
+    """
+    arrays = {"bits": matrix.bits, "indptr": matrix.indptr, "indices": matrix.indices}
+    if matrix.weights is not None:
+        arrays["weights"] = matrix.weights
+
+    # 1. Layout: header first, then every array at an aligned offset
+    layout, offset = {}, 0
+    for name, values in arrays.items():
+        layout[name] = {"dtype": values.dtype.str, "shape": list(values.shape), "offset": offset}
+        offset += -(-values.nbytes // ALIGN) * ALIGN
+    header = json.dumps({"columns": [str(c) for c in matrix.columns], "source_hash": source_hash,
+                         "arrays": layout}).encode()
+    data_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    # 2. Write and swap in, so readers never map a half-written file
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + np.uint64(len(header)).tobytes() + header)
+        for name, values in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(np.ascontiguousarray(values).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+    return path
+
+
+def read_header(path):
+    """
+    Header of a matrix file, with 'data_start' (offset of the array block) added.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an encoded matrix file")
+        size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        header = json.loads(f.read(size))
+    header["data_start"] = -(-(len(MAGIC) + 8 + size) // ALIGN) * ALIGN
+    return header
+
+
+def open_matrix(path, mmap=True):
+    """
+    BitsetMatrix over the arrays of a matrix file; with mmap=True they are
+    read-only memory maps, otherwise copies in memory.
+    """
+    header = read_header(path)
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        shape = tuple(spec["shape"])
+        if not np.prod(shape):
+            arrays[name] = np.zeros(shape, dtype=spec["dtype"])
+        elif mmap:
+            offset = header["data_start"] + spec["offset"]
+            arrays[name] = np.memmap(path, dtype=spec["dtype"], mode="r", offset=offset, shape=shape)
+        else:
+            with open(path, "rb") as f:
+                f.seek(header["data_start"] + spec["offset"])
+                arrays[name] = np.fromfile(f, dtype=spec["dtype"], count=int(np.prod(shape))).reshape(shape)
+    return BitsetMatrix(np.array(header["columns"], dtype=object), arrays["indptr"], arrays["indices"],
+                        arrays.get("weights"), bits=arrays["bits"])
+
+
+def matrix_path(level, source_hash, out_dir=MATRIX_DIR):
+    return Path(out_dir) / f"{level}_{source_hash[:16]}.bsm"
+
+
+def shared_matrix(level, results_dir=RESULTS_DIR, out_dir=None, mmap=True):
+    """
+    Memory-mapped encoding of results/<level>_baskets.pkl: opens the file of
+    the pickle's current hash (in <results_dir>/encoded by default), or
+    encodes the pickle and writes it first.
+    """
+    out_dir = Path(results_dir) / "encoded" if out_dir is None else Path(out_dir)
+    source_hash = file_hash(Path(results_dir) / f"{level}_baskets.pkl")
+    path = matrix_path(level, source_hash, out_dir)
+    if not path.exists():
+        save_matrix(encode_baskets(load_baskets(level, results_dir)["basket"]), path, source_hash)
+        # Older versions of this level are stale now
+        for stale in out_dir.glob(f"{level}_*.bsm"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+    return open_matrix(path, mmap)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the memory-mapped encoded basket matrices")
+    parser.add_argument("--levels", nargs="+", choices=["user", "session"], default=["user", "session"])
+    parser.add_argument("--out", type=Path, default=MATRIX_DIR)
+    args = parser.parse_args(argv)
+
+    for level in args.levels:
+        start = perf_counter()
+        matrix = shared_matrix(level, out_dir=args.out)
+        path = matrix_path(level, file_hash(RESULTS_DIR / f"{level}_baskets.pkl"), args.out)
+        print(f"{level:>8}: {matrix.shape[0]} baskets x {matrix.shape[1]} items -> {path} "
+              f"({path.stat().st_size / 1024:.0f} KiB, {(perf_counter() - start) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
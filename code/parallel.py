@@ -0,0 +1,86 @@
+# code/parallel.py
+"""
+Parallel Frequent-Itemset Mining
+Splits the Eclat search space by first item (prefix equivalence classes) across
+a ProcessPoolExecutor. The packed bitsets of the root class are placed in
+shared memory once; workers attach to that block by name instead of receiving
+a pickled copy of the matrix. Results are merged into one frame identical to
+the serial eclat() output.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from eclat import as_bitsets, eclat, min_count_for, mine_member, root_class, to_frame
+
+# Per-process state set by _init_worker
+_WORKER = {}
+
+
+def _init_worker(shm_name, shape, items, counts, min_count, max_len, diffset_depth, pair_counts):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _WORKER.update(
+        shm=shm,  # keep a reference so the buffer stays mapped
+        bits=np.ndarray(shape, dtype=np.uint64, buffer=shm.buf),
+        items=items,
+        counts=counts,
+        min_count=min_count,
+        max_len=max_len,
+        diffset_depth=diffset_depth,
+        pair_counts=pair_counts,
+    )
+
+
+def _mine_prefix(i):
+    # One task = the subtree of root member i
+    found = []
+    mine_member(
+        (), _WORKER["items"], _WORKER["bits"], _WORKER["counts"], False, i,
+        _WORKER["min_count"], _WORKER["max_len"], _WORKER["diffset_depth"], found,
+        _WORKER["pair_counts"]
+    )
+    return found
+
+
+def parallel_eclat(df, min_support=0.5, use_colnames=False, max_len=None, verbose=0,
+                   diffset_depth=3, workers=None, pair_counts=None):
+    """
+    Eclat with one task per first item, mined on 'workers' processes
+    (default: all cores). Same output as eclat().
+    """
+    workers = workers or os.cpu_count()
+    matrix = as_bitsets(df)
+    n = matrix.n_transactions
+    if matrix.weights is not None:
+        # Workers only see the shared bitsets, not the row weights
+        return eclat(matrix, min_support, use_colnames, max_len, verbose, diffset_depth, pair_counts)
+    if n == 0:
+        return pd.DataFrame({"support": [], "itemsets": []})
+    min_count = min_count_for(min_support, n)
+    items, bits, counts = root_class(matrix, min_count)
+
+    found = []
+    if len(items):
+        # 1. Copy the root bitsets into shared memory once
+        shm = shared_memory.SharedMemory(create=True, size=max(bits.nbytes, 1))
+        try:
+            np.ndarray(bits.shape, dtype=np.uint64, buffer=shm.buf)[:] = bits
+
+            # 2. Rarest items have the largest classes: submit them first
+            init_args = (shm.name, bits.shape, items, counts, min_count, max_len, diffset_depth, pair_counts)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+                for part in pool.map(_mine_prefix, range(len(items))):
+                    found.extend(part)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    if verbose:
+        print(f"Parallel Eclat ({workers} workers): {len(found)} frequent itemsets")
+
+    # 3. Merge: to_frame sorts, so the frame matches the serial output
+    return to_frame(found, n, matrix.columns if use_colnames else None)
@@ -0,0 +1,317 @@
+# code/pipeline.py
+"""
+Headless Pipeline Runner
+Runs the stages of the notebook chain 01 -> 02/03 -> 04 -> 05 from the
+command line:
+
+    extract    01_connection: snapshot refresh + one session scan -> results/*_baskets.pkl
+    encode     memory-mapped BitsetMatrix file of each basket level (matrix_file.py)
+    sweep      02/03 support sweep (one mining pass, see sweep.py)
+    elite      02/03 elite rules at the chosen thresholds
+    benchmark  04 Apriori / FP-Growth / Eclat lifecycle comparison
+    export     CSVs + the per-stage timing report in results/pipeline/
+
+Every stage output is cached under results/pipeline/cache, keyed by a hash of
+the stage parameters, the source of the modules it runs and its inputs (the
+content hash of the basket pickles, or the key of the upstream stage), so
+only stages whose inputs changed are re-run. The user and session chains are
+independent and run in parallel processes; the benchmark stages then run one
+at a time so their timings do not compete for the CPU.
+
+Run from the repo root, e.g.
+    python code/pipeline.py                      # cached re-run of everything
+    python code/pipeline.py --extract            # pull fresh baskets first (needs .env)
+    python code/pipeline.py --levels session --force elite
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from bench_runner import PROJECT_ROOT, file_hash, run_metadata
+
+RESULTS_DIR = PROJECT_ROOT / "results"
+PIPELINE_DIR = RESULTS_DIR / "pipeline"
+CODE_DIR = Path(__file__).resolve().parent
+
+# Thresholds chosen in 02_apriori_user / 03_apriori_session / 04_fpg_comparison
+LEVELS = {
+    "user": {
+        "sweep": {"supports": [round(s, 2) for s in np.arange(0.3, 0.19, -0.01)], "confidence": 0.6},
+        "elite": {"mine_support": 0.23, "mine_confidence": 0.6, "min_support": 0.23,
+                  "min_confidence": 0.6, "min_lift": 3.0, "top": 20},
+        "benchmark": {"support": 0.23, "confidence": 0.65},
+    },
+    "session": {
+        "sweep": {"supports": [round(s, 4) for s in np.arange(0.06, 0.029, -0.005)], "confidence": 0.8},
+        "elite": {"mine_support": 0.04, "mine_confidence": 0.8, "min_support": 0.045,
+                  "min_confidence": 0.9, "min_lift": 0.0, "top": 20},
+        "benchmark": {"support": 0.045, "confidence": 0.9},
+    },
+}
+
+# Modules each stage runs; their sources and every code/ module they import
+# (see module_closure) are part of the stage's cache key
+STAGE_MODULES = {
+    "encode": ["matrix_file.py"],
+    "sweep": ["sweep.py", "eclat.py"],
+    "elite": ["eclat.py", "vector_rules.py"],
+    "benchmark": ["benchmarks.py"],
+}
+
+
+@lru_cache(maxsize=None)
+def module_closure(names):
+    """
+    The code/ modules in 'names' plus all code/ modules they import at module
+    level, directly or indirectly (so e.g. every engine in benchmarks.ALGORITHMS).
+    """
+    seen, pending = set(), list(names)
+    while pending:
+        name = pending.pop()
+        if name in seen or not (CODE_DIR / name).exists():
+            continue
+        seen.add(name)
+        nodes = list(ast.parse((CODE_DIR / name).read_text()).body)
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue  # lazy imports belong to the functions that run them
+            nodes.extend(ast.iter_child_nodes(node))
+            if isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(f"{node.module.split('.')[0]}.py")
+            elif isinstance(node, ast.Import):
+                pending.extend(f"{alias.name.split('.')[0]}.py" for alias in node.names)
+    return tuple(sorted(seen))
+
+
+def stage_key(stage, level, params, inputs):
+    """
+    Cache key: stage, level, parameters, input hashes and module sources.
+    """
+    modules = module_closure(tuple(STAGE_MODULES.get(stage, [])))
+    code = {name: file_hash(CODE_DIR / name) for name in modules}
+    payload = json.dumps({"stage": stage, "level": level, "params": params, "inputs": inputs, "code": code},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def cached(stage, level, params, inputs, func, cache_dir, force=()):
+    """
+    Loads the stage output from the cache, or runs func() and stores it.
+    Returns (output, key, timing record).
+    """
+    key = stage_key(stage, level, params, inputs)
+    path = Path(cache_dir) / f"{level}_{stage}_{key}.pkl"
+    start = perf_counter()
+    if path.exists() and stage not in force:
+        with open(path, "rb") as f:
+            output = pickle.load(f)
+        status = "cached"
+    else:
+        output = func()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path.with_suffix(".tmp"), "wb") as f:
+            pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+        path.with_suffix(".tmp").replace(path)
+        status = "ran"
+    record = {"Stage": stage, "Level": level, "Status": status,
+              "Wall_MS": (perf_counter() - start) * 1000, "Key": key}
+    return output, key, record
+
+
+def extract(levels, results_dir=RESULTS_DIR):
+    """
+    01_connection: refreshes the local snapshot and rewrites the basket pickles.
+    Both levels come from one session-level scan (levels.py).
+    """
+    from levels import basket_frames, encode_levels_from_db
+    from snapshot import connect, refresh_snapshot
+
+    refresh_snapshot()
+    con = connect()
+    try:
+        frames = basket_frames(encode_levels_from_db(con))
+    finally:
+        con.close()
+    for level in levels:
+        frames[level].to_pickle(Path(results_dir) / f"{level}_baskets.pkl")
+
+
+def encode_stage(level, results_dir):
+    from matrix_file import shared_matrix
+
+    return shared_matrix(level, results_dir)
+
+
+def sweep_stage(matrix, supports, confidence):
+    from eclat import eclat
+    from sweep import support_sweep
+
+    df_sweep = support_sweep(matrix, supports, confidence, algorithm=eclat, keep_frames=False)
+    df_sweep["Growth_Rate"] = df_sweep["Rule_Count"] / df_sweep["Rule_Count"].shift(1)
+    df_sweep.attrs = {}
+    return df_sweep
+
+
+def elite_stage(matrix, mine_support, mine_confidence, min_support, min_confidence, min_lift, top):
+    from eclat import eclat
+    from vector_rules import generate_rules
+
+    rules = generate_rules(eclat(matrix, mine_support, use_colnames=True), "confidence", mine_confidence)
+    elite = rules[
+        (rules["support"] >= min_support)
+        & (rules["confidence"] >= min_confidence)
+        & (rules["lift"] >= min_lift)
+    ].sort_values("lift", ascending=False, kind="stable").head(top).copy()
+    elite["len_ant"] = elite["antecedents"].apply(len)
+    elite["len_con"] = elite["consequents"].apply(len)
+    elite["total_len"] = elite["len_ant"] + elite["len_con"]
+    return elite.reset_index(drop=True)
+
+
+def benchmark_stage(matrix, level, support, confidence, algorithms, repeat):
+    from benchmarks import benchmark_harness
+
+    records = benchmark_harness(matrix.to_frame(), support, confidence, level.title(), algorithms,
+                                warmup=int(repeat > 1), repeat=repeat)
+    return [{k: v for k, v in r.items() if k != "Rules_Ref"} for r in records]
+
+
+def run_level(level, basket_hash, results_dir, cache_dir, force):
+    """
+    encode -> sweep -> elite for one basket level (one worker process).
+    Returns ({stage: (output, key)}, timing records).
+    """
+    params = LEVELS[level]
+    outputs, timings = {}, []
+
+    # 1. Encode: the memory-mapped matrix file of the basket pickle is its own cache;
+    #    only its path travels back to the parent process
+    from matrix_file import matrix_path
+
+    start = perf_counter()
+    key = stage_key("encode", level, {}, {"baskets": basket_hash})
+    path = matrix_path(level, basket_hash, Path(results_dir) / "encoded")
+    mapped = path.exists() and "encode" not in force
+    if not mapped:
+        path.unlink(missing_ok=True)
+    matrix = encode_stage(level, results_dir)
+    outputs["encode"] = (path, key)
+    timings.append({"Stage": "encode", "Level": level, "Status": "mapped" if mapped else "ran",
+                    "Wall_MS": (perf_counter() - start) * 1000, "Key": key})
+
+    # 2. Sweep and elite rules: keyed by the encode key
+    for stage, func in (("sweep", sweep_stage), ("elite", elite_stage)):
+        output, output_key, record = cached(stage, level, params[stage], {"encode": key},
+                                            lambda: func(matrix, **params[stage]), cache_dir, force)
+        outputs[stage] = (output, output_key)
+        timings.append(record)
+    return outputs, timings
+
+
+def export(outputs, benchmarks, out_dir):
+    """
+    Writes the per-level sweep logs and elite rules and the benchmark table.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for level, stages in outputs.items():
+        stages["sweep"][0].to_csv(out_dir / f"{level}_sweep.csv", index=False)
+        stages["elite"][0].to_csv(out_dir / f"apriori_{level}_elite_rules.csv", index=False)
+    if benchmarks:
+        pd.DataFrame(benchmarks).to_csv(out_dir / "correctness_comparison.csv", index=False)
+
+
+def run_pipeline(levels=("user", "session"), extract_first=False, jobs=2, algorithms=None, repeat=1,
+                 benchmark=True, force=(), results_dir=RESULTS_DIR, out_dir=PIPELINE_DIR):
+    """
+    Runs the pipeline and returns the timing report (one row per stage).
+    """
+    results_dir, out_dir = Path(results_dir), Path(out_dir)
+    cache_dir = out_dir / "cache"
+    timings = []
+
+    # 1. Extract (only on request: needs the database credentials)
+    if extract_first:
+        start = perf_counter()
+        extract(levels, results_dir)
+        timings.append({"Stage": "extract", "Level": "all", "Status": "ran",
+                        "Wall_MS": (perf_counter() - start) * 1000, "Key": ""})
+    basket_hashes = {level: file_hash(results_dir / f"{level}_baskets.pkl") for level in levels}
+
+    # 2. Independent level chains, in parallel processes
+    args = [(level, basket_hashes[level], results_dir, cache_dir, tuple(force)) for level in levels]
+    if jobs > 1 and len(levels) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(levels))) as pool:
+            finished = list(pool.map(run_level, *zip(*args)))
+    else:
+        finished = [run_level(*a) for a in args]
+    outputs = {}
+    for level, (stages, level_timings) in zip(levels, finished):
+        outputs[level] = stages
+        timings.extend(level_timings)
+
+    # 3. Benchmarks, one at a time so the timings are not skewed
+    from matrix_file import open_matrix
+
+    benchmarks = []
+    if benchmark:
+        for level in levels:
+            path, encode_key = outputs[level]["encode"]
+            matrix = open_matrix(path)
+            params = dict(LEVELS[level]["benchmark"], algorithms=algorithms, repeat=repeat)
+            records, _, record = cached(
+                "benchmark", level, params, {"encode": encode_key},
+                lambda: benchmark_stage(matrix, level, params["support"], params["confidence"], algorithms, repeat),
+                cache_dir, force,
+            )
+            benchmarks.extend(records)
+            timings.append(record)
+
+    # 4. Export
+    start = perf_counter()
+    export(outputs, benchmarks, out_dir)
+    timings.append({"Stage": "export", "Level": "all", "Status": "ran",
+                    "Wall_MS": (perf_counter() - start) * 1000, "Key": ""})
+    report = pd.DataFrame(timings)
+    report.to_csv(out_dir / "timing_report.csv", index=False)
+    with open(out_dir / "run.json", "w") as f:
+        json.dump(run_metadata(levels=list(levels), jobs=jobs, algorithms=algorithms, repeat=repeat,
+                               benchmark=benchmark, force=list(force)), f, indent=2, default=str)
+    return report
+
+
+def main(argv=None):
+    from benchmarks import ALGORITHMS
+
+    parser = argparse.ArgumentParser(description="Headless 01 -> 02/03 -> 04 -> 05 pipeline")
+    parser.add_argument("--levels", nargs="+", choices=list(LEVELS), default=list(LEVELS))
+    parser.add_argument("--extract", action="store_true", help="refresh the snapshot and basket pickles first")
+    parser.add_argument("--jobs", type=int, default=2, help="parallel level chains")
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument("--repeat", type=int, default=1, help="timed repeats per benchmark")
+    parser.add_argument("--no-benchmark", action="store_true")
+    parser.add_argument("--force", nargs="+", default=[], choices=["encode", "sweep", "elite", "benchmark"],
+                        help="re-run these stages even when cached")
+    parser.add_argument("--out", type=Path, default=PIPELINE_DIR)
+    args = parser.parse_args(argv)
+
+    start = perf_counter()
+    report = run_pipeline(args.levels, args.extract, args.jobs, args.algorithms, args.repeat,
+                          not args.no_benchmark, args.force, out_dir=args.out)
+    print(report.drop(columns="Key").to_string(index=False, float_format=lambda v: f"{v:,.1f}"))
+    print(f"Total: {(perf_counter() - start):.2f} s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# code/profiler.py
+"""
+Single-Pass Column Profiler
+Computes nulls, distinct counts (exact or HyperLogLog), min/max and top-k for
+every column of a table in ONE aggregate query, instead of three full-table
+queries per column. Profiles of the local snapshot are cached in the snapshot
+file itself (_column_profile) and also serve the row / distinct-user counts
+used by investigation.py and relationship_analysis.py.
+"""
+
+import pandas as pd
+
+PROFILE_TABLE = "_column_profile"
+
+
+def _column_expr(column, approx, top_k):
+    col = f'"{column}"'
+    distinct = f"approx_count_distinct({col})" if approx else f"count(DISTINCT {col})"
+    return (
+        f"{{'nulls': count(*) - count({col}), "
+        f"'distinct': {distinct}, "
+        f"'min': min({col})::VARCHAR, "
+        f"'max': max({col})::VARCHAR, "
+        f"'top_k': approx_top_k({col}, {top_k})::VARCHAR[]}} AS {col}"
+    )
+
+
+def profile_table(con, table, catalog="mysql_db", approx=False, top_k=5) -> pd.DataFrame:
+    """
+    Profiles every column of catalog.table with a single scan.
+    Returns one row per column.
+    """
+    schema = con.execute(f"DESCRIBE {catalog}.{table}").df()
+    columns = schema["column_name"].tolist()
+
+    # 1. One aggregate pass: total rows + one struct of stats per column
+    select = ", ".join(["count(*) AS __total_rows"] + [_column_expr(c, approx, top_k) for c in columns])
+    row = con.execute(f"SELECT {select} FROM {catalog}.{table}").fetchone()
+    total = row[0]
+
+    # 2. One output row per column
+    return pd.DataFrame([
+        {
+            "table_name": table,
+            "column_name": column,
+            "data_type": dtype,
+            "total_rows": total,
+            "nulls": stats["nulls"],
+            "distinct": stats["distinct"],
+            "approx_distinct": approx,
+            "min": stats["min"],
+            "max": stats["max"],
+            "top_k": list(stats["top_k"] or []),
+        }
+        for column, dtype, stats in zip(columns, schema["column_type"], row[1:])
+    ])
+
+
+def cache_profiles(con, tables, approx=False, top_k=5):
+    """
+    (Re)computes the profiles of 'tables' in the connection's default
+    database and stores them in _column_profile.
+    """
+    profiles = pd.concat(
+        [profile_table(con, t, catalog=con.execute("SELECT current_database()").fetchone()[0],
+                       approx=approx, top_k=top_k) for t in tables],
+        ignore_index=True,
+    )
+    con.register("_profiles", profiles)
+    con.execute(f"CREATE OR REPLACE TABLE {PROFILE_TABLE} AS SELECT * FROM _profiles")
+    con.unregister("_profiles")
+    return profiles
+
+
+def load_profile(con, table, catalog="mysql_db") -> pd.DataFrame:
+    """
+    Returns the cached profile of a table, or computes it in one pass when
+    the attached catalog has no cache (e.g. a direct MySQL attach).
+    """
+    cached = con.execute(
+        "SELECT count(*) FROM duckdb_tables() WHERE database_name = ? AND table_name = ?",
+        [catalog, PROFILE_TABLE],
+    ).fetchone()[0]
+    if cached:
+        profile = con.execute(
+            f"SELECT * FROM {catalog}.{PROFILE_TABLE} WHERE table_name = ?", [table]
+        ).df()
+        if not profile.empty:
+            return profile
+    return profile_table(con, table, catalog=catalog)
+
+
+def row_count(profile):
+    return int(profile["total_rows"].iloc[0])
+
+
+def distinct_count(profile, column):
+    return int(profile.loc[profile["column_name"] == column, "distinct"].iloc[0])
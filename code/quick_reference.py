@@ -3,27 +3,15 @@ Quick Reference: Association Rule Mining Queries
 Ready-to-use queries for your association rule mining project
 """
 
-import os
-import duckdb
 import pandas as pd
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Build the DuckDB-specific MySQL connection string
-mysql_config = (
-    f"host={os.getenv('DB_HOST')} "
-    f"user={os.getenv('DB_USER')} "
-    f"password={os.getenv('DB_PWD')} "
-    f"database={os.getenv('DB_NAME')} "
-    f"port={os.getenv('DB_PORT')}"
-)
 
-# Initialize DuckDB and attach MySQL
-con = duckdb.connect()
-con.execute("INSTALL mysql; LOAD mysql;")
-con.execute(f"ATTACH '{mysql_config}' AS mysql_db (TYPE MYSQL);")
+from cooccurrence import cooccurrence_table
+from encoding import encode_baskets
+from snapshot import connect
+
+# Attach rawdataDec15/features as 'mysql_db' from the local snapshot
+# (refresh with snapshot.refresh_snapshot(); connect(remote=True) hits MySQL)
+con = connect()
 
 print("=" * 80)
 print("ASSOCIATION RULE MINING - QUICK REFERENCE QUERIES")
@@ -97,30 +85,11 @@ print(df_filtered_baskets.head().to_string(index=False))
 print("\n" + "=" * 80)
 print("\n4. MILESTONE CO-OCCURRENCE (top pairs)")
 print("-" * 80)
-cooccurrence_query = """
-WITH session_milestones AS (
-    SELECT 
-        user_id,
-        date,
-        milestone_name
-    FROM mysql_db.rawdataDec15
-)
-SELECT 
-    a.milestone_name as milestone_1,
-    b.milestone_name as milestone_2,
-    COUNT(DISTINCT a.user_id || '_' || a.date) as sessions_together,
-    COUNT(DISTINCT a.user_id) as users_together
-FROM session_milestones a
-JOIN session_milestones b 
-    ON a.user_id = b.user_id 
-    AND a.date = b.date 
-    AND a.milestone_name < b.milestone_name
-GROUP BY a.milestone_name, b.milestone_name
-ORDER BY sessions_together DESC
-LIMIT 20
-"""
-
-df_cooccurrence = con.execute(cooccurrence_query).df()
+# Pair counts come from one sparse product X^T X over the encoded session
+# baskets of query 2 (no self-join of rawdataDec15). users_together is still
+# the number of distinct users with a session containing both milestones.
+session_matrix = encode_baskets(df_session_baskets['basket'])
+df_cooccurrence = cooccurrence_table(session_matrix, df_session_baskets['user_id'], top=20)
 print(f"Top 20 milestone pairs by co-occurrence:")
 print(df_cooccurrence.to_string(index=False))
 
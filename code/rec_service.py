@@ -0,0 +1,309 @@
+# code/rec_service.py
+"""
+Recommendation Service
+A small local asyncio HTTP service over the mined session rules: it takes the
+milestones of a user's current session and returns the ranked next-milestone
+suggestions of a RuleStore, tagged with the tactical persona of 03_apriori_session.
+
+- Concurrent requests are queued and answered in batches: the batcher waits
+  at most max_wait_ms for up to max_batch requests and matches them all in
+  one RuleStore.recommend_batch call.
+- The rule file is watched (mtime) and can be reloaded on POST /reload. The
+  new store is built off the event loop and swapped in between batches, so
+  no request is dropped or answered from a half-loaded store.
+- Every request's queue + matching time is logged; GET /stats reports p50/p99.
+
+Run from the repo root, e.g.
+    python code/rec_service.py --rules results/apriori_session_elite_rules.csv --port 8580
+Rules can be a rules CSV (elite CSVs / association_rules.to_csv), a pickled
+rules frame, or a RuleStore directory.
+
+    POST /recommend  {"milestones": ["UploadImage", "TxtBIUS"], "top": 5}
+    POST /reload     reload the rule file now
+    GET  /stats      latency percentiles, batch sizes, rule-file version
+    GET  /health
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from collections import deque
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from rule_store import RuleStore
+
+# Tactical session personas (03_apriori_session, section 10) and their signature milestones
+PERSONAS = {
+    "Quick-Fire Messenger": {"SendNow", "ReportsTab"},
+    "Content Editor": {"AddImage", "TxtFontSizeColor"},
+    "Audit Investigator": {"OpenReportList", "OpensAndBounces"},
+}
+
+STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+def persona_of(milestones):
+    """
+    Persona whose signature milestones overlap the most with 'milestones'
+    (None when none overlap).
+    """
+    overlap = {name: len(signature & set(milestones)) for name, signature in PERSONAS.items()}
+    name = max(overlap, key=overlap.get)
+    return name if overlap[name] else None
+
+
+def load_store(path):
+    """
+    RuleStore from a store directory, a rules CSV or a pickled rules frame.
+    """
+    path = Path(path)
+    if path.is_dir():
+        return RuleStore.load(path)
+    if path.suffix == ".pkl":
+        return RuleStore.from_rules(pd.read_pickle(path))
+    return RuleStore.from_csv(path)
+
+
+def rules_mtime(path):
+    # Latest modification time of the rule file (or of any file in a store directory)
+    path = Path(path)
+    files = list(path.iterdir()) if path.is_dir() else [path]
+    return max(os.stat(f).st_mtime_ns for f in files)
+
+
+class LatencyLog:
+    """
+    The last 'size' request latencies (ms) and batch sizes.
+    """
+
+    def __init__(self, size=10_000):
+        self.latencies = deque(maxlen=size)
+        self.batches = deque(maxlen=size)
+        self.requests = 0
+
+    def add_batch(self, latencies_ms):
+        self.latencies.extend(latencies_ms)
+        self.batches.append(len(latencies_ms))
+        self.requests += len(latencies_ms)
+
+    def summary(self):
+        if not self.latencies:
+            return {"Requests": self.requests}
+        p50, p99 = np.percentile(self.latencies, [50, 99])
+        return {
+            "Requests": self.requests,
+            "P50_MS": float(p50),
+            "P99_MS": float(p99),
+            "Max_MS": float(max(self.latencies)),
+            "Mean_Batch": float(np.mean(self.batches)),
+            "Max_Batch": int(max(self.batches)),
+        }
+
+
+class RecommendationService:
+    """
+    Batched recommendations over a hot-reloadable RuleStore.
+    """
+
+    def __init__(self, rules_path, max_batch=64, max_wait_ms=2.0, top=5, metric="confidence",
+                 watch_interval=1.0):
+        self.rules_path = Path(rules_path)
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.top = top
+        self.metric = metric
+        self.watch_interval = watch_interval
+        self.store = load_store(self.rules_path)
+        self.mtime = rules_mtime(self.rules_path)
+        self.version = 1
+        self.log = LatencyLog()
+        self.queue = None
+        self._reloading = None
+
+    async def recommend(self, milestones, top=None):
+        """
+        Queues one session for the batcher and waits for its suggestions.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((list(milestones), self.top if top is None else top, perf_counter(), future))
+        return await future
+
+    async def _batcher(self):
+        while True:
+            # 1. Block for the first request, then gather more until full or max_wait
+            batch = [await self.queue.get()]
+            deadline = asyncio.get_running_loop().time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # 2. One vectorised match for the whole batch, on the current store
+            store, version = self.store, self.version
+            top = max(t for _, t, _, _ in batch)
+            try:
+                ranked = store.recommend_batch([m for m, _, _, _ in batch], top, self.metric)
+            except Exception:
+                # Retry one request at a time so a bad request only fails itself
+                ranked = []
+                for milestones, _, _, _ in batch:
+                    try:
+                        ranked.append(store.recommend_batch([milestones], top, self.metric)[0])
+                    except Exception as error:
+                        ranked.append(error)
+
+            done = perf_counter()
+            for (milestones, top, _, future), suggestions in zip(batch, ranked):
+                if future.done():
+                    continue
+                if isinstance(suggestions, Exception):
+                    future.set_exception(suggestions)
+                else:
+                    suggestions = suggestions[:top]
+                    future.set_result({
+                        "recommendations": [{"milestone": m, "score": s} for m, s in suggestions],
+                        "persona": persona_of(milestones + [m for m, _ in suggestions]),
+                        "rules_version": version,
+                    })
+            self.log.add_batch([(done - start) * 1000 for _, _, start, _ in batch])
+
+    async def reload(self):
+        """
+        Rebuilds the store off the event loop and swaps it in. Concurrent
+        reload calls share one rebuild.
+        """
+        if self._reloading is None or self._reloading.done():
+            self._reloading = asyncio.ensure_future(self._reload())
+        return await asyncio.shield(self._reloading)
+
+    async def _reload(self):
+        mtime = rules_mtime(self.rules_path)
+        store = await asyncio.get_running_loop().run_in_executor(None, load_store, self.rules_path)
+        self.store, self.mtime = store, mtime
+        self.version += 1
+        return {"rules_version": self.version, "rules": len(store)}
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            try:
+                changed = rules_mtime(self.rules_path) != self.mtime
+            except OSError:
+                continue  # file is being replaced
+            if changed:
+                try:
+                    await self.reload()
+                except Exception as error:  # keep serving the old rules until the file changes again
+                    self.mtime = rules_mtime(self.rules_path)
+                    print(f"Reload of {self.rules_path} failed: {error}")
+
+    def stats(self):
+        return dict(self.log.summary(), Rules=len(self.store), Rules_Version=self.version,
+                    Rules_Path=str(self.rules_path), Queue=self.queue.qsize() if self.queue else 0)
+
+    async def handle(self, method, path, body):
+        """
+        Routes one request; returns (status, JSON-able payload).
+        """
+        if path == "/recommend":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                request = json.loads(body or b"{}")
+                milestones = request["milestones"]
+                top = int(request.get("top", self.top))
+            except (ValueError, KeyError, TypeError) as error:
+                return 400, {"error": f"expected {{'milestones': [...], 'top': n}}: {error}"}
+            if not isinstance(milestones, list) or not all(isinstance(m, str) for m in milestones):
+                return 400, {"error": "'milestones' must be a list of strings"}
+            if top < 0:
+                return 400, {"error": "'top' must be >= 0"}
+            return 200, await self.recommend(milestones, top)
+        if path == "/reload":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            return 200, await self.reload()
+        if path == "/stats":
+            return 200, self.stats()
+        if path == "/health":
+            return 200, {"status": "ok"}
+        return 404, {"error": f"unknown path {path}"}
+
+    async def _connection(self, reader, writer):
+        # Minimal HTTP/1.1 with keep-alive: one request at a time per connection
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                try:
+                    status, payload = await self.handle(method, path.split("?")[0], body)
+                except Exception as error:
+                    status, payload = 500, {"error": str(error)}
+                data = json.dumps(payload).encode()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS[status]}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode() + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8580):
+        self.queue = asyncio.Queue()
+        tasks = [asyncio.ensure_future(self._batcher()), asyncio.ensure_future(self._watch())]
+        server = await asyncio.start_server(self._connection, host, port)
+        print(f"Serving {len(self.store)} rules from {self.rules_path} on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local next-milestone recommendation service")
+    parser.add_argument("--rules", type=Path, default=Path(__file__).resolve().parent.parent
+                        / "results" / "apriori_session_elite_rules.csv")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8580)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--metric", choices=["confidence", "lift", "support"], default="confidence")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--watch-interval", type=float, default=1.0, help="seconds between rule-file checks")
+    args = parser.parse_args(argv)
+
+    service = RecommendationService(args.rules, args.max_batch, args.max_wait_ms, args.top, args.metric,
+                                    args.watch_interval)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"Stopped: {service.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 import nbformat
 import os
 
-notebook_path = '/home/bhavik/Dropbox/edu/smu/winter/data_mining/a3_association/5580-dm-a3-association/code/03_apriori_session.ipynb'
+notebook_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '03_apriori_session.ipynb')
 
 with open(notebook_path, 'r', encoding='utf-8') as f:
     nb = nbformat.read(f, as_version=4)
@@ -3,27 +3,14 @@ Table Relationship Analysis
 Analyzes the relationship between rawdataDec15 and features tables
 """
 
-import os
-import duckdb
 import pandas as pd
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from profiler import distinct_count, load_profile
+from snapshot import connect
 
-# Build the DuckDB-specific MySQL connection string
-mysql_config = (
-    f"host={os.getenv('DB_HOST')} "
-    f"user={os.getenv('DB_USER')} "
-    f"password={os.getenv('DB_PWD')} "
-    f"database={os.getenv('DB_NAME')} "
-    f"port={os.getenv('DB_PORT')}"
-)
-
-# Initialize DuckDB and attach MySQL
-con = duckdb.connect()
-con.execute("INSTALL mysql; LOAD mysql;")
-con.execute(f"ATTACH '{mysql_config}' AS mysql_db (TYPE MYSQL);")
+# Attach rawdataDec15/features as 'mysql_db' from the local snapshot
+# (refresh with snapshot.refresh_snapshot(); connect(remote=True) hits MySQL)
+con = connect()
 
 print("=" * 80)
 print("TABLE RELATIONSHIP ANALYSIS")
@@ -34,8 +21,8 @@ print("\n1. Checking if features table is a subset of rawdataDec15:")
 print("-" * 80)
 
 # Get unique users in each table
-users_rawdata = con.execute("SELECT COUNT(DISTINCT user_id) FROM mysql_db.rawdataDec15").fetchone()[0]
-users_features = con.execute("SELECT COUNT(DISTINCT user_id) FROM mysql_db.features").fetchone()[0]
+users_rawdata = distinct_count(load_profile(con, "rawdataDec15"), "user_id")
+users_features = distinct_count(load_profile(con, "features"), "user_id")
 
 print(f"Unique users in rawdataDec15: {users_rawdata:,}")
 print(f"Unique users in features:     {users_features:,}")
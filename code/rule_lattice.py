@@ -0,0 +1,74 @@
+# code/rule_lattice.py
+"""
+Rule Lattice
+Generates association rules ONCE at the lowest confidence of a tuning range and
+answers every higher threshold by a sorted index lookup instead of calling
+association_rules per gamma.
+"""
+
+import numpy as np
+import pandas as pd
+from mlxtend.frequent_patterns import association_rules
+
+
+class RuleLattice:
+    """
+    Rules sorted by ascending confidence, with suffix sums of lift/confidence so
+    that count and means for 'confidence >= gamma' are O(log n) lookups.
+    """
+
+    def __init__(self, itemsets, min_confidence):
+        self.min_confidence = float(min_confidence)
+
+        # 1. One rule generation at the floor of the range
+        rules = association_rules(
+            itemsets,
+            metric="confidence",
+            min_threshold=self.min_confidence
+        )
+
+        # 2. Sort once by confidence (stable, so ties keep mlxtend's order)
+        self.rules = rules.sort_values("confidence", kind="stable").reset_index(drop=True)
+        self._confidence = self.rules["confidence"].to_numpy()
+
+        # 3. Suffix sums: _lift_sum[i] = sum(lift[i:])
+        lift = self.rules["lift"].to_numpy()
+        self._lift_sum = np.append(np.cumsum(lift[::-1])[::-1], 0.0)
+        self._conf_sum = np.append(np.cumsum(self._confidence[::-1])[::-1], 0.0)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _start(self, gamma):
+        if gamma < self.min_confidence:
+            raise ValueError(
+                f"gamma={gamma} is below the lattice floor {self.min_confidence}; "
+                "rebuild the lattice with a lower min_confidence."
+            )
+        return int(np.searchsorted(self._confidence, gamma, side="left"))
+
+    def rules_at(self, gamma) -> pd.DataFrame:
+        """
+        Returns the rules with confidence >= gamma (same rows as
+        association_rules(..., min_threshold=gamma)).
+        """
+        return self.rules.iloc[self._start(gamma):]
+
+    def stats(self, gamma):
+        """
+        Returns count, mean lift and mean confidence for confidence >= gamma.
+        """
+        start = self._start(gamma)
+        count = len(self.rules) - start
+        return {
+            "Confidence": round(float(gamma), 2),
+            "Rule_Count": count,
+            "Avg_Lift": self._lift_sum[start] / count if count else 0,
+            "Avg_Confidence": self._conf_sum[start] / count if count else 0,
+        }
+
+    def sweep(self, conf_range) -> pd.DataFrame:
+        """
+        Returns one stats row per confidence threshold (the df_stability table).
+        """
+        return pd.DataFrame([self.stats(conf) for conf in conf_range])
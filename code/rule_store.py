@@ -0,0 +1,204 @@
+# code/rule_store.py
+"""
+Columnar Rule Store
+Persists a rules frame (association_rules / generate_rules / the elite CSVs)
+for live recommendations.
+
+- Milestones become integer ids; antecedents and consequents are packed
+  uint64 bitmasks (one row per rule) plus a CSR list of consequent ids.
+- An inverted index maps each milestone to the rules whose smallest
+  antecedent id it is, so every rule sits in exactly one posting list.
+- A query ORs the session's milestones into a mask, gathers the posting lists
+  of those milestones and keeps the rules whose antecedent mask is a subset
+  of the session mask.
+
+Arrays are saved as .npy files in one directory and opened with
+np.load(mmap_mode='r'), so loading costs nothing until a rule is touched.
+"""
+
+import ast
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from encoding import WORD_BITS
+
+STORE_METRICS = ("support", "confidence", "lift")
+ARRAYS = ("antecedents", "consequents", "consequent_ptr", "consequent_ids", "index_ptr", "index_rules")
+
+
+def parse_itemset(value):
+    """
+    frozenset from a rules-CSV cell such as "frozenset({'A', 'B'})".
+    """
+    if isinstance(value, frozenset):
+        return value
+    text = value.strip()
+    if text.startswith("frozenset(") and text.endswith(")"):
+        text = text[len("frozenset("):-1]
+    return frozenset(ast.literal_eval(text)) if text else frozenset()
+
+
+def _gather(ptr, values, rows):
+    # CSR rows 'rows' of (ptr, values) flattened, plus the length of each row
+    starts, lengths = ptr[rows], ptr[rows + 1] - ptr[rows]
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return values[np.repeat(starts, lengths) + offsets], lengths
+
+
+class RuleStore:
+    """
+    Rules as columnar arrays + an item -> rules inverted index.
+    """
+
+    def __init__(self, items, arrays, metrics):
+        self.items = list(items)
+        self.item_ids = {item: i for i, item in enumerate(self.items)}
+        self.n_words = max((len(self.items) + WORD_BITS - 1) // WORD_BITS, 1)
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.metrics = metrics
+
+    def __len__(self):
+        return len(self.antecedents)
+
+    @classmethod
+    def from_rules(cls, rules):
+        """
+        Builds a store from a frame with antecedents / consequents
+        (frozensets, or their CSV strings) and the STORE_METRICS columns.
+        """
+        antecedents = [parse_itemset(a) for a in rules["antecedents"]]
+        consequents = [parse_itemset(c) for c in rules["consequents"]]
+        items = sorted(set().union(*antecedents, *consequents))
+        ids = {item: i for i, item in enumerate(items)}
+        n_words = max((len(items) + WORD_BITS - 1) // WORD_BITS, 1)
+
+        def pack(itemsets):
+            masks = np.zeros((len(itemsets), n_words), dtype=np.uint64)
+            flat = np.array([ids[item] for itemset in itemsets for item in itemset], dtype=np.int64)
+            rows = np.repeat(np.arange(len(itemsets)), [len(itemset) for itemset in itemsets])
+            np.bitwise_or.at(masks, (rows, flat // WORD_BITS),
+                             np.left_shift(np.uint64(1), (flat % WORD_BITS).astype(np.uint64)))
+            return masks
+
+        # 1. Consequent ids as CSR (the items a matching rule recommends)
+        consequent_ids = [sorted(ids[item] for item in c) for c in consequents]
+        consequent_ptr = np.zeros(len(rules) + 1, dtype=np.int64)
+        np.cumsum([len(c) for c in consequent_ids], out=consequent_ptr[1:])
+
+        # 2. Inverted index on the smallest antecedent id: one posting per rule
+        first = np.array([min(ids[item] for item in a) for a in antecedents], dtype=np.int64)
+        index_rules = np.argsort(first, kind="stable").astype(np.int64)
+        index_ptr = np.zeros(len(items) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(first, minlength=len(items)), out=index_ptr[1:])
+
+        arrays = {
+            "antecedents": pack(antecedents),
+            "consequents": pack(consequents),
+            "consequent_ptr": consequent_ptr,
+            "consequent_ids": np.array([i for c in consequent_ids for i in c], dtype=np.int64),
+            "index_ptr": index_ptr,
+            "index_rules": index_rules,
+        }
+        metrics = {m: rules[m].to_numpy(dtype=float) for m in STORE_METRICS}
+        return cls(items, arrays, metrics)
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls.from_rules(pd.read_csv(path))
+
+    def save(self, store_dir):
+        """
+        Writes one .npy per array plus meta.json (vocabulary, metric names).
+        """
+        store_dir = Path(store_dir)
+        store_dir.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            np.save(store_dir / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        for name, values in self.metrics.items():
+            np.save(store_dir / f"metric_{name}.npy", values)
+        with open(store_dir / "meta.json", "w") as f:
+            json.dump({"items": self.items, "metrics": list(self.metrics), "rules": len(self)}, f, indent=2)
+        return store_dir
+
+    @classmethod
+    def load(cls, store_dir, mmap=True):
+        """
+        Opens a saved store; with mmap=True the arrays are memory-mapped.
+        """
+        store_dir = Path(store_dir)
+        with open(store_dir / "meta.json") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        arrays = {name: np.load(store_dir / f"{name}.npy", mmap_mode=mode) for name in ARRAYS}
+        metrics = {name: np.load(store_dir / f"metric_{name}.npy", mmap_mode=mode) for name in meta["metrics"]}
+        return cls(meta["items"], arrays, metrics)
+
+    def session_mask(self, milestones):
+        """
+        Bitmask of the known milestones (unknown ones are ignored) and their ids.
+        """
+        ids = np.array(sorted({self.item_ids[m] for m in milestones if m in self.item_ids}), dtype=np.int64)
+        mask = np.zeros(self.n_words, dtype=np.uint64)
+        np.bitwise_or.at(mask, ids // WORD_BITS, np.left_shift(np.uint64(1), (ids % WORD_BITS).astype(np.uint64)))
+        return mask, ids
+
+    def match(self, milestones):
+        """
+        Ids of the rules whose antecedent is contained in 'milestones'.
+        """
+        mask, ids = self.session_mask(milestones)
+        if not len(ids):
+            return np.empty(0, dtype=np.int64)
+        # 1. Candidates: posting lists of the session's milestones
+        candidates, _ = _gather(self.index_ptr, self.index_rules, ids)
+        # 2. Subset test: no antecedent bit outside the session mask
+        outside = (self.antecedents[candidates] & ~mask).any(axis=1)
+        return candidates[~outside]
+
+    def recommend(self, milestones, top=5, metric="confidence"):
+        """
+        Next likely milestones: consequents of the matching rules that the
+        session has not hit yet, each scored by its best rule's 'metric'.
+        Returns [(milestone, score), ...] best first.
+        """
+        return self.recommend_batch([milestones], top, metric)[0]
+
+    def recommend_batch(self, sessions, top=5, metric="confidence"):
+        """
+        recommend() for many sessions at once: the posting lists of every
+        (session, milestone) pair are expanded into (session, rule) pairs and
+        subset-tested together. Returns one list per session.
+        """
+        if not sessions:
+            return []
+        masks, hits = zip(*(self.session_mask(s) for s in sessions))
+        masks = np.stack(masks)
+
+        # 1. (session, rule) candidates from the posting lists of each session's milestones
+        hit_rows = np.repeat(np.arange(len(sessions)), [len(ids) for ids in hits])
+        hit_ids = np.concatenate(hits)
+        rules, lengths = _gather(self.index_ptr, self.index_rules, hit_ids)
+        owners = np.repeat(hit_rows, lengths)
+
+        # 2. Keep the pairs whose antecedent sits inside the session mask
+        inside = ~(self.antecedents[rules] & ~masks[owners]).any(axis=1)
+        owners, rules = owners[inside], rules[inside]
+
+        # 3. Best score per (session, milestone) in a dense sessions x items table
+        targets, lengths = _gather(self.consequent_ptr, self.consequent_ids, rules)
+        scores = np.repeat(np.asarray(self.metrics[metric])[rules], lengths)
+        best = np.full((len(sessions), len(self.items)), -np.inf)
+        np.maximum.at(best, (np.repeat(owners, lengths), targets), scores)
+        # Milestones the session already hit are not recommended
+        best[hit_rows, hit_ids] = -np.inf
+
+        # 4. Top milestones per session (ties by milestone id)
+        order = np.argsort(-best, axis=1, kind="stable")[:, :top]
+        return [
+            [(self.items[t], float(v)) for t, v in zip(ranked, values) if v > -np.inf]
+            for ranked, values in zip(order, np.take_along_axis(best, order, axis=1))
+        ]
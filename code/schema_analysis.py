@@ -3,27 +3,14 @@ Enhanced Schema Analysis
 This script uses alternative methods to get detailed schema information
 """
 
-import os
-import duckdb
 import pandas as pd
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from profiler import load_profile
+from snapshot import connect
 
-# Build the DuckDB-specific MySQL connection string
-mysql_config = (
-    f"host={os.getenv('DB_HOST')} "
-    f"user={os.getenv('DB_USER')} "
-    f"password={os.getenv('DB_PWD')} "
-    f"database={os.getenv('DB_NAME')} "
-    f"port={os.getenv('DB_PORT')}"
-)
-
-# Initialize DuckDB and attach MySQL
-con = duckdb.connect()
-con.execute("INSTALL mysql; LOAD mysql;")
-con.execute(f"ATTACH '{mysql_config}' AS mysql_db (TYPE MYSQL);")
+# Attach rawdataDec15/features as 'mysql_db' from the local snapshot
+# (refresh with snapshot.refresh_snapshot(); connect(remote=True) hits MySQL)
+con = connect()
 
 print("=" * 80)
 print("ENHANCED SCHEMA ANALYSIS")
@@ -62,21 +49,16 @@ for col in sample_features.columns:
     print(f"  {col:20} -> {dtype}")
 
 # Method 3: Check for NULL values and unique counts
+# One aggregate pass per table (cached with the local snapshot)
 print("\n5. Data quality check - rawdataDec15:")
 print("-" * 80)
-for col in sample_rawdata.columns:
-    null_count = con.execute(f"SELECT COUNT(*) FROM mysql_db.rawdataDec15 WHERE {col} IS NULL").fetchone()[0]
-    unique_count = con.execute(f"SELECT COUNT(DISTINCT {col}) FROM mysql_db.rawdataDec15").fetchone()[0]
-    total_count = con.execute(f"SELECT COUNT(*) FROM mysql_db.rawdataDec15").fetchone()[0]
-    print(f"  {col:20} - Nulls: {null_count:8,} | Unique: {unique_count:8,} | Total: {total_count:8,}")
+for _, col in load_profile(con, "rawdataDec15").iterrows():
+    print(f"  {col['column_name']:20} - Nulls: {col['nulls']:8,} | Unique: {col['distinct']:8,} | Total: {col['total_rows']:8,}")
 
 print("\n6. Data quality check - features:")
 print("-" * 80)
-for col in sample_features.columns:
-    null_count = con.execute(f"SELECT COUNT(*) FROM mysql_db.features WHERE {col} IS NULL").fetchone()[0]
-    unique_count = con.execute(f"SELECT COUNT(DISTINCT {col}) FROM mysql_db.features").fetchone()[0]
-    total_count = con.execute(f"SELECT COUNT(*) FROM mysql_db.features").fetchone()[0]
-    print(f"  {col:20} - Nulls: {null_count:8,} | Unique: {unique_count:8,} | Total: {total_count:8,}")
+for _, col in load_profile(con, "features").iterrows():
+    print(f"  {col['column_name']:20} - Nulls: {col['nulls']:8,} | Unique: {col['distinct']:8,} | Total: {col['total_rows']:8,}")
 
 # Method 4: Check distinct values for key columns
 print("\n7. Sample distinct values:")
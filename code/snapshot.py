@@ -0,0 +1,128 @@
+# code/snapshot.py
+"""
+Local Snapshot of the SimplyCast Tables
+Copies rawdataDec15 and features from the remote MySQL server into one local
+DuckDB file (sorted by user_id, date) and refreshes it incrementally from the
+'id' high-water mark, caching the column profiles (profiler.py) alongside.
+connect() attaches that file under the same 'mysql_db' alias, so every
+existing query runs locally without modification.
+"""
+
+import os
+from datetime import datetime
+from pathlib import Path
+
+import duckdb
+from dotenv import load_dotenv
+
+from profiler import PROFILE_TABLE, cache_profiles
+
+SNAPSHOT_PATH = Path(__file__).resolve().parent.parent / "results" / "simplycast_snapshot.duckdb"
+
+# Table -> local sort order (clusters the rows each basket query groups on)
+TABLES = {
+    "rawdataDec15": "user_id, date, id",
+    "features": "user_id, id",
+}
+
+
+def mysql_config():
+    """
+    Builds the DuckDB-specific MySQL connection string from .env.
+    """
+    load_dotenv()
+    return (
+        f"host={os.getenv('DB_HOST')} "
+        f"user={os.getenv('DB_USER')} "
+        f"password={os.getenv('DB_PWD')} "
+        f"database={os.getenv('DB_NAME')} "
+        f"port={os.getenv('DB_PORT')}"
+    )
+
+
+def attach_source(con, source=None):
+    """
+    Attaches the source tables as 'mysql_db': the remote MySQL server by
+    default, or a DuckDB file (fixture / stand-in) when 'source' is a path.
+    """
+    if source is None:
+        con.execute("INSTALL mysql; LOAD mysql;")
+        con.execute(f"ATTACH '{mysql_config()}' AS mysql_db (TYPE MYSQL, READ_ONLY);")
+    else:
+        con.execute(f"ATTACH '{source}' AS mysql_db (READ_ONLY);")
+
+
+def refresh_snapshot(path=SNAPSHOT_PATH, source=None):
+    """
+    Creates or incrementally refreshes the local snapshot.
+    Only rows with id above the stored high-water mark are pulled.
+    Returns one summary row per table.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect(str(path))
+    attach_source(con, source)
+
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS _snapshot_log (
+            table_name VARCHAR,
+            high_water_id BIGINT,
+            rows_added BIGINT,
+            refreshed_at TIMESTAMP
+        )
+    """)
+
+    summary = []
+    for table, order in TABLES.items():
+        exists = con.execute(
+            "SELECT count(*) FROM duckdb_tables() WHERE database_name = current_database() AND table_name = ?",
+            [table],
+        ).fetchone()[0]
+
+        if not exists:
+            # 1. First copy: one remote scan, stored sorted
+            con.execute(f"CREATE TABLE {table} AS SELECT * FROM mysql_db.{table} ORDER BY {order}")
+            added = con.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        else:
+            # 2. Refresh: only rows past the high-water mark, then re-cluster locally
+            high_water = con.execute(f"SELECT coalesce(max(id), -1) FROM {table}").fetchone()[0]
+            added = con.execute(
+                f"INSERT INTO {table} SELECT * FROM mysql_db.{table} WHERE id > ?", [high_water]
+            ).fetchone()[0]
+            if added:
+                con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM {table} ORDER BY {order}")
+
+        high_water = con.execute(f"SELECT coalesce(max(id), -1) FROM {table}").fetchone()[0]
+        con.execute(
+            "INSERT INTO _snapshot_log VALUES (?, ?, ?, ?)",
+            [table, high_water, added, datetime.now()],
+        )
+        summary.append({"table": table, "high_water_id": high_water, "rows_added": added})
+
+    # 3. Column profiles are recomputed locally whenever the data changed
+    has_profile = con.execute(
+        "SELECT count(*) FROM duckdb_tables() WHERE database_name = current_database() AND table_name = ?",
+        [PROFILE_TABLE],
+    ).fetchone()[0]
+    if not has_profile or any(s["rows_added"] for s in summary):
+        cache_profiles(con, list(TABLES))
+
+    con.close()
+    return summary
+
+
+def connect(remote=False, path=SNAPSHOT_PATH, source=None):
+    """
+    Returns a DuckDB connection with the SimplyCast tables attached as
+    'mysql_db'. By default that is the local snapshot (created on first use);
+    remote=True attaches the MySQL server directly, as the scripts used to.
+    """
+    con = duckdb.connect()
+    if remote:
+        attach_source(con, source)
+        return con
+
+    if not Path(path).exists():
+        refresh_snapshot(path, source)
+    con.execute(f"ATTACH '{path}' AS mysql_db (READ_ONLY);")
+    return con
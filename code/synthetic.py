@@ -0,0 +1,141 @@
+# code/synthetic.py
+"""
+Synthetic Basket Generator (IBM Quest style)
+Produces reproducible baskets for scalability benchmarks without the database,
+following the Agrawal & Srikant generator:
+
+1. A pool of 'potentially frequent' patterns is drawn. Pattern sizes are
+   Poisson(avg_pattern_len). Each pattern takes an exponentially distributed
+   fraction (mean = correlation) of its items from the previous pattern, and
+   the rest at random. Every pattern has an exponential weight and a
+   corruption level ~ N(corruption, 0.1).
+2. Every transaction gets a target length (Poisson(avg_len), or resampled from
+   a real length distribution). It is then filled with weighted pattern picks.
+   Each item of a picked pattern is dropped with that pattern's corruption
+   level, and the basket is cut at its target length.
+
+calibrate() fits the item universe, item popularity and basket lengths to
+session_baskets.pkl, so 'factor x the real data' can be generated on demand.
+"""
+
+import numpy as np
+import pandas as pd
+
+from encoding import BitsetMatrix
+
+
+def calibrate(baskets) -> dict:
+    """
+    Generator parameters matching a real basket column: item names, item
+    frequency distribution and the empirical basket-length distribution.
+    """
+    lengths = np.fromiter((len(b) for b in baskets), dtype=np.int64, count=len(baskets))
+    items = pd.Series(np.concatenate([np.asarray(b, dtype=object) for b in baskets])).value_counts()
+    items = items.sort_index()
+    return {
+        "n_items": len(items),
+        "avg_len": float(lengths.mean()),
+        "item_names": items.index.to_numpy(dtype=object),
+        "item_weights": (items / items.sum()).to_numpy(),
+        "lengths": lengths,
+    }
+
+
+def make_patterns(rng, n_items, n_patterns, avg_pattern_len, correlation, corruption, item_weights=None):
+    """
+    Returns the pattern pool as (indptr, items, weights, corruption levels).
+    """
+    p = np.full(n_items, 1 / n_items) if item_weights is None else np.asarray(item_weights, dtype=float)
+    sizes = np.clip(rng.poisson(avg_pattern_len, n_patterns), 1, n_items)
+
+    patterns, prev = [], np.empty(0, dtype=np.int64)
+    for size in sizes:
+        # 1. Correlated part: a fraction of the previous pattern
+        n_prev = min(int(round(rng.exponential(correlation) * size)), size, len(prev))
+        shared = rng.choice(prev, n_prev, replace=False) if n_prev else np.empty(0, dtype=np.int64)
+
+        # 2. Remaining items by popularity, without repeats
+        weights = p.copy()
+        weights[shared] = 0
+        n_new = min(size - n_prev, np.count_nonzero(weights))
+        fresh = rng.choice(n_items, n_new, replace=False, p=weights / weights.sum()) if n_new else shared[:0]
+
+        prev = np.sort(np.concatenate([shared, fresh]))
+        patterns.append(prev)
+
+    indptr = np.zeros(n_patterns + 1, dtype=np.int64)
+    np.cumsum([len(q) for q in patterns], out=indptr[1:])
+    weights = rng.exponential(1.0, n_patterns)
+    levels = np.clip(rng.normal(corruption, 0.1, n_patterns), 0.0, 0.95)
+    return indptr, np.concatenate(patterns), weights / weights.sum(), levels
+
+
+def _fill_chunk(rng, targets, n_items, patterns, avg_pattern_len, corruption):
+    # One chunk of transactions as sorted (tid, item) pairs
+    p_indptr, p_items, p_weights, p_levels = patterns
+    n = len(targets)
+
+    # 1. Enough weighted pattern picks per transaction to reach its target length
+    kept = max(avg_pattern_len * (1 - corruption), 0.5)
+    picks = np.ceil(1.5 * targets / kept).astype(np.int64) + 1
+    pick_tid = np.repeat(np.arange(n), picks)
+    pick = rng.choice(len(p_weights), len(pick_tid), p=p_weights)
+
+    # 2. Explode picks into items, dropping each with the pattern's corruption level
+    sizes = np.diff(p_indptr)[pick]
+    offsets = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    items = p_items[np.repeat(p_indptr[pick], sizes) + offsets]
+    tids = np.repeat(pick_tid, sizes)
+    keep = rng.random(len(items)) >= np.repeat(p_levels[pick], sizes)
+    tids, items = tids[keep], items[keep]
+
+    # 3. First occurrence of each (tid, item) in pick order, cut at the target length
+    _, first = np.unique(tids * n_items + items, return_index=True)
+    first.sort()
+    tids, items = tids[first], items[first]
+    rank = np.arange(len(tids)) - np.searchsorted(tids, tids)
+    cut = rank < targets[tids]
+    tids, items = tids[cut], items[cut]
+
+    order = np.lexsort((items, tids))
+    return tids[order], items[order]
+
+
+def generate_matrix(n_transactions, n_items=100, avg_len=10, n_patterns=None, avg_pattern_len=4,
+                    correlation=0.5, corruption=0.5, item_names=None, item_weights=None,
+                    lengths=None, seed=0, chunk_size=100_000) -> BitsetMatrix:
+    """
+    Generates n_transactions baskets straight into a BitsetMatrix.
+    'lengths' (an empirical sample) replaces the Poisson(avg_len) basket
+    lengths; the same seed always gives the same baskets.
+    """
+    rng = np.random.default_rng(seed)
+    n_patterns = n_patterns or 2 * n_items
+    patterns = make_patterns(rng, n_items, n_patterns, avg_pattern_len, correlation, corruption, item_weights)
+
+    counts, indices = [], []
+    for start in range(0, n_transactions, chunk_size):
+        # Chunked so 100x data sizes stay within memory
+        n = min(chunk_size, n_transactions - start)
+        if lengths is None:
+            targets = np.maximum(rng.poisson(avg_len, n), 1)
+        else:
+            targets = rng.choice(np.asarray(lengths), n)
+        tids, items = _fill_chunk(rng, targets, n_items, patterns, avg_pattern_len, corruption)
+        counts.append(np.bincount(tids, minlength=n))
+        indices.append(items)
+
+    indptr = np.zeros(n_transactions + 1, dtype=np.int64)
+    if n_transactions:
+        np.cumsum(np.concatenate(counts), out=indptr[1:])
+    names = np.array([f"item_{i:04d}" for i in range(n_items)], dtype=object) if item_names is None else item_names
+    return BitsetMatrix(names, indptr, np.concatenate(indices) if indices else [])
+
+
+def generate_baskets(n_transactions, seed=0, **params) -> pd.DataFrame:
+    """
+    Same as generate_matrix, returned as a 'basket' column like the pickles.
+    """
+    matrix = generate_matrix(n_transactions, seed=seed, **params)
+    names = matrix.columns[matrix.indices]
+    return pd.DataFrame({"basket": np.split(names, matrix.indptr[1:-1])})
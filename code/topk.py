@@ -0,0 +1,209 @@
+# code/topk.py
+"""
+Top-k Rule Miner
+Keeps a heap of the k best rules by 'metric' while expanding itemsets, and
+stops once no rule below its support bound can still enter the heap.
+
+Itemsets are expanded best-first (highest support first) over the
+set-enumeration tree, above a bound that starts at the min_support floor:
+
+- metric 'support' raises the bound to the support of the weakest rule in
+  the full heap;
+- metric 'leverage' raises it to the weakest leverage, since
+  leverage(X -> Y) <= support(XY).
+
+Only these two rankings need no support threshold. Lift and confidence give
+no lower bound on support (a rarer superset can always score higher), so a
+lift or confidence top-k still needs min_support, i.e. a sigma from a sweep.
+To rank without one, use metric='leverage': min_lift stays a filter and the
+lift column is still returned.
+
+The elite CSVs of 02/03 are the lift top 20 above the sigmas their sweep and
+elbow picked (user: support 0.23, confidence 0.6, lift 3; session: support
+0.045, confidence 0.9). ELITE holds those thresholds so main() can check
+the miner against the committed results/apriori_<level>_elite_rules.csv.
+Weighted matrices (compress.py) are counted with their row weights.
+"""
+
+import argparse
+import heapq
+import math
+from itertools import combinations, count as counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from eclat import as_bitsets, min_count_for
+
+METRICS = ("lift", "confidence", "support", "leverage")
+# Rankings that raise the support bound themselves (min_support is optional)
+BOUNDED_METRICS = ("support", "leverage")
+
+# extract_elite_20 / elite_20_df thresholds of 02_apriori_user and 03_apriori_session
+# (the sigmas come from their support sweep and elbow, they are not derived here)
+ELITE = {
+    "user": {"min_support": 0.23, "min_confidence": 0.6, "min_lift": 3.0},
+    "session": {"min_support": 0.045, "min_confidence": 0.9, "min_lift": 0.0},
+}
+
+RESULTS_DIR = Path(__file__).resolve().parent.parent / "results"
+
+
+def _rules_of(itemset, count, count_of, n, min_confidence, min_lift):
+    # Every X -> Z \ X split of one itemset that passes the elite filters
+    for size in range(1, len(itemset)):
+        for antecedent in combinations(itemset, size):
+            consequent = tuple(i for i in itemset if i not in antecedent)
+            confidence = count / count_of(antecedent)
+            if confidence < min_confidence:
+                continue
+            lift = confidence * n / count_of(consequent)
+            if lift < min_lift:
+                continue
+            leverage = count / n - count_of(antecedent) * count_of(consequent) / n ** 2
+            yield antecedent, consequent, {"support": count / n, "confidence": confidence,
+                                           "lift": lift, "leverage": leverage}
+
+
+def _metric_bound(metric, weakest, n):
+    # Smallest count a rule needs to beat the weakest heap entry (0: no bound)
+    if metric == "support":
+        return round(weakest * n)
+    if metric == "leverage":
+        return math.floor(weakest * n)
+    return 0
+
+
+def topk_rules(df, k=20, min_confidence=0.9, metric="lift", min_lift=3.0, use_colnames=True,
+               verbose=0, min_support=None) -> pd.DataFrame:
+    """
+    The k best rules by 'metric' with support >= min_support, confidence >=
+    min_confidence and lift >= min_lift (same columns as the elite CSVs).
+    min_support is required for 'lift' and 'confidence', which cannot bound
+    support; 'support' and 'leverage' raise the bound themselves.
+    attrs['support_bound'] is the support the search ended at.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}, got {metric!r}")
+    if min_support is None and metric not in BOUNDED_METRICS:
+        raise ValueError(f"metric {metric!r} gives no support bound: pass min_support, "
+                         f"or rank by one of {BOUNDED_METRICS}")
+
+    matrix = as_bitsets(df)
+    n = matrix.total_weight
+    counts = matrix.item_counts()
+    # Set-enumeration order: most frequent item first
+    order = np.argsort(-counts, kind="stable")
+    bits = matrix.bits[order]
+
+    cache = {}
+
+    def count_of(itemset):
+        if itemset not in cache:
+            cache[itemset] = matrix.itemset_count(itemset)
+        return cache[itemset]
+
+    heap = []  # (metric, support, tie-breaker, rule) of the k best rules so far
+    ties = counter()
+    floor = max(min_count_for(min_support or 0.0, n), 1) if n else 1
+    bound = floor
+    frontier = [(-int(c), (i,)) for i, c in enumerate(counts[order]) if c >= bound]
+    heapq.heapify(frontier)
+    expanded = 0
+
+    while frontier:
+        # 1. Best-first: the remaining itemset with the highest support
+        neg_count, positions = heapq.heappop(frontier)
+        count = -neg_count
+        if count < bound:
+            break
+        expanded += 1
+
+        itemset = tuple(sorted(int(order[p]) for p in positions))
+        for antecedent, consequent, values in _rules_of(itemset, count, count_of, n, min_confidence, min_lift):
+            entry = (values[metric], count, next(ties), (antecedent, consequent, values))
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+        # 2. A full heap raises the support bound from its weakest metric value
+        if len(heap) == k:
+            bound = max(bound, _metric_bound(metric, heap[0][0], n))
+
+        # 3. Children: extend with later items, keep those above the bound
+        last = positions[-1]
+        if last + 1 < len(order):
+            tids = np.bitwise_and.reduce(bits[list(positions)], axis=0)
+            child_counts = matrix.count(bits[last + 1:] & tids)
+            for offset in np.flatnonzero(child_counts >= bound):
+                heapq.heappush(frontier, (-int(child_counts[offset]), positions + (last + 1 + int(offset),)))
+
+    if verbose:
+        print(f"Top-{k}: expanded {expanded} itemsets, support bound {bound / n:.4f}")
+
+    label = (lambda ids: frozenset(matrix.columns[list(ids)])) if use_colnames else frozenset
+    rules = [
+        dict(values, antecedents=label(antecedent), consequents=label(consequent))
+        for _, _, _, (antecedent, consequent, values) in heap
+    ]
+    columns = ["antecedents", "consequents", "support", "confidence", "lift"]
+    result = pd.DataFrame(rules, columns=columns + ["leverage"])
+    result = result.sort_values([metric, "support"], ascending=False, kind="stable").reset_index(drop=True)
+    result = result[columns if metric != "leverage" else columns + ["leverage"]]
+    result.attrs["support_bound"] = bound / n
+    result.attrs["expanded_itemsets"] = expanded
+    return result
+
+
+def same_rules(result, elite, tol=1e-9):
+    """
+    True when two rule frames hold the same rules with the same support,
+    confidence and lift (row order ignored).
+    """
+    def keyed(df):
+        keys = [(frozenset(a), frozenset(c)) for a, c in zip(df["antecedents"], df["consequents"])]
+        return dict(zip(keys, df[["support", "confidence", "lift"]].to_numpy(dtype=float)))
+
+    ours, theirs = keyed(result), keyed(elite)
+    return ours.keys() == theirs.keys() and all(np.allclose(ours[r], theirs[r], atol=tol) for r in ours)
+
+
+def check_elite(level, baskets=None, k=20, results_dir=RESULTS_DIR):
+    """
+    topk_rules at the ELITE thresholds vs the committed elite CSV of 'level'.
+    Returns (matches, top-k frame).
+    """
+    from bench_runner import load_baskets
+    from encoding import encode_baskets
+    from rule_store import parse_itemset
+
+    baskets = load_baskets(level, results_dir)["basket"] if baskets is None else baskets
+    result = topk_rules(encode_baskets(baskets), k, **ELITE[level])
+    elite = pd.read_csv(Path(results_dir) / f"apriori_{level}_elite_rules.csv")
+    elite["antecedents"] = elite["antecedents"].map(parse_itemset)
+    elite["consequents"] = elite["consequents"].map(parse_itemset)
+    return same_rules(result, elite), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Top-k elite rules vs the committed elite CSVs")
+    parser.add_argument("--levels", nargs="+", choices=list(ELITE), default=list(ELITE))
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    failed = []
+    for level in args.levels:
+        matches, result = check_elite(level, k=args.k)
+        print(f"{level:>8}: {len(result)} rules, lift {result['lift'].min():.2f}-{result['lift'].max():.2f}, "
+              f"support bound {result.attrs['support_bound']:.4f} -> {'matches' if matches else 'DIFFERS from'} "
+              f"apriori_{level}_elite_rules.csv")
+        if not matches:
+            failed.append(level)
+    if failed:
+        raise SystemExit(f"top-k differs from the elite CSV for: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
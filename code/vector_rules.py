@@ -0,0 +1,200 @@
+# code/vector_rules.py
+"""
+Vectorized Rule Generation
+Drop-in replacement for mlxtend association_rules on a frequent-itemset frame.
+
+Itemsets are re-encoded as packed uint64 item masks, and the subset supports
+are looked up through a hash index over those masks (np.searchsorted on
+sorted uint64 hashes) instead of a frozenset dict. All itemsets of one length are split into
+antecedent/consequent at once, one combination pattern at a time, and every
+metric is computed as a NumPy array with the same formulas as mlxtend.
+The output frozensets are the frame's own itemset objects, picked by index
+for the rules that pass the threshold; no frozensets are built per rule.
+
+The rule set and the metric values are identical to association_rules. Rows
+follow the same itemset / antecedent-size order; within one antecedent size
+they are in sorted item order rather than frozenset hash order.
+"""
+
+import inspect
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from mlxtend.frequent_patterns import association_rules
+
+# Every metric this module computes (the mlxtend >= 0.24 set), in output order
+METRICS = [
+    "antecedent support",
+    "consequent support",
+    "support",
+    "confidence",
+    "lift",
+    "representativity",
+    "leverage",
+    "conviction",
+    "zhangs_metric",
+    "jaccard",
+    "certainty",
+    "kulczynski",
+]
+
+# Columns of the installed association_rules (0.23.x has no return_metrics)
+_returned = inspect.signature(association_rules).parameters.get("return_metrics")
+DEFAULT_METRICS = list(_returned.default) if _returned is not None else [
+    "antecedent support", "consequent support", "support", "confidence",
+    "lift", "leverage", "conviction", "zhangs_metric",
+]
+
+
+def rule_metrics(sAC, sA, sC):
+    """
+    Every association_rules metric as arrays (num_itemsets=1, no null values).
+    """
+    confidence = sAC / sA
+    leverage = sAC - sA * sC
+    with np.errstate(divide="ignore", invalid="ignore"):
+        conviction = np.full(confidence.shape, np.inf)
+        below = confidence < 1.0
+        conviction[below] = (1.0 - sC[below]) / (1.0 - confidence[below])
+
+        denominator = np.maximum(sAC * (1 - sA), sA * (sC - sAC))
+        zhangs_metric = np.where(denominator == 0, 0, leverage / denominator)
+        certainty = np.where(1 - sC == 0, 0, (confidence - sC) / (1 - sC))
+
+    return {
+        "antecedent support": sA,
+        "consequent support": sC,
+        "support": sAC,
+        "confidence": confidence,
+        "lift": confidence / sC,
+        "representativity": np.ones_like(sAC),
+        "leverage": leverage,
+        "conviction": conviction,
+        "zhangs_metric": zhangs_metric,
+        "jaccard": sAC / (sA + sC - sAC),
+        "certainty": certainty,
+        "kulczynski": (sAC / sA + sAC / sC) / 2,
+    }
+
+
+class MaskIndex:
+    """
+    Hash index of packed item masks -> frame row (the role of
+    association_rules' frozenset dict): a sorted uint64 hash searched with
+    np.searchsorted. Hash hits are verified against the full mask and any
+    miss falls back to an exact search on the raw masks.
+    """
+
+    def __init__(self, masks):
+        self.masks = np.ascontiguousarray(masks)
+        self.width = masks.shape[1] * 8
+        self.multipliers = np.uint64(0x9E3779B97F4A7C15) ** np.arange(1, masks.shape[1] + 1, dtype=np.uint64)
+        hashes = self._hash(self.masks)
+        self.order = np.argsort(hashes, kind="stable")
+        self.hashes = hashes[self.order]
+        raw = self._raw(self.masks)
+        self.raw_order = np.argsort(raw, kind="stable")
+        self.raw = raw[self.raw_order]
+
+    def _hash(self, masks):
+        with np.errstate(over="ignore"):
+            return np.bitwise_xor.reduce(masks * self.multipliers, axis=1)
+
+    def _raw(self, masks):
+        return np.ascontiguousarray(masks).view(np.dtype((np.void, self.width))).ravel()
+
+    def lookup(self, masks):
+        pos = np.minimum(np.searchsorted(self.hashes, self._hash(masks)), len(self.hashes) - 1)
+        rows = self.order[pos]
+        unresolved = np.flatnonzero((self.masks[rows] != masks).any(axis=1))
+        if len(unresolved):
+            # Hash collisions (or absent itemsets): exact search on the masks
+            keys = self._raw(masks[unresolved])
+            exact = np.minimum(np.searchsorted(self.raw, keys), len(self.raw) - 1)
+            missing = self.raw[exact] != keys
+            if missing.any():
+                raise KeyError(
+                    f"{int(missing.sum())} rule antecedents/consequents are not in the itemset frame"
+                )
+            rows[unresolved] = self.raw_order[exact]
+        return rows
+
+
+def encode_itemsets(itemsets):
+    """
+    Returns (vocabulary, list of sorted id arrays, packed masks) for an
+    'itemsets' column of frozensets.
+    """
+    vocabulary = sorted({item for itemset in itemsets for item in itemset}, key=lambda x: (str(type(x)), x))
+    ids = {item: i for i, item in enumerate(vocabulary)}
+    encoded = [np.array(sorted(ids[item] for item in itemset), dtype=np.int64) for itemset in itemsets]
+
+    n_words = max((len(vocabulary) + 63) // 64, 1)
+    masks = np.zeros((len(encoded), n_words), dtype=np.uint64)
+    if encoded:
+        flat = np.concatenate(encoded)
+        rows = np.repeat(np.arange(len(encoded)), [len(items) for items in encoded])
+        np.bitwise_or.at(masks, (rows, flat >> 6), np.left_shift(np.uint64(1), (flat & 63).astype(np.uint64)))
+    return np.array(vocabulary, dtype=object), encoded, masks
+
+
+def _masks_of(ids, n_words):
+    # Packed masks of an (m x r) block of item ids (OR of one-item masks)
+    items = np.zeros((int(ids.max()) + 1, n_words), dtype=np.uint64)
+    unique = np.unique(ids)
+    items[unique, unique >> 6] = np.left_shift(np.uint64(1), (unique & 63).astype(np.uint64))
+    return np.bitwise_or.reduce(items[ids], axis=1)
+
+
+def generate_rules(df, metric="confidence", min_threshold=0.8, return_metrics=DEFAULT_METRICS) -> pd.DataFrame:
+    """
+    association_rules(df, metric=..., min_threshold=...) computed on integer
+    masks. Same columns and values; raises KeyError when an antecedent or
+    consequent support is missing from df.
+    """
+    if not df.shape[0]:
+        raise ValueError("The input DataFrame `df` containing the frequent itemsets is empty.")
+    if metric not in METRICS:
+        raise ValueError(f"Metric must be one of {METRICS}, got '{metric}'")
+
+    vocabulary, encoded, masks = encode_itemsets(df["itemsets"].values)
+    index = MaskIndex(masks)
+    itemsets = df["itemsets"].to_numpy(dtype=object)
+    support = df["support"].to_numpy(dtype=float)
+    lengths = np.array([len(items) for items in encoded])
+
+    parts = []
+    for length in np.unique(lengths[lengths > 1]):
+        # 1. All itemsets of one length as an (m x length) id block
+        rows = np.flatnonzero(lengths == length)
+        block = np.stack([encoded[r] for r in rows])
+
+        # 2. One vectorised split per antecedent pattern (sizes largest first)
+        pattern = 0
+        for size in range(length - 1, 0, -1):
+            for cols in combinations(range(length), size):
+                rest = [c for c in range(length) if c not in cols]
+                parts.append((
+                    rows, np.full(len(rows), pattern),
+                    _masks_of(block[:, cols], masks.shape[1]),
+                    _masks_of(block[:, rest], masks.shape[1]),
+                ))
+                pattern += 1
+
+    if not parts:
+        return pd.DataFrame(columns=["antecedents", "consequents"] + list(return_metrics))
+
+    # 3. One batched index lookup, then every metric for every candidate rule
+    row_ids, patterns, ante_masks, cons_masks = (np.concatenate(column) for column in zip(*parts))
+    ante_rows, cons_rows = index.lookup(ante_masks), index.lookup(cons_masks)
+    values = rule_metrics(support[row_ids], support[ante_rows], support[cons_rows])
+    keep = np.flatnonzero(values[metric] >= min_threshold)
+
+    # 4. association_rules order: itemset row, then antecedent size descending
+    keep = keep[np.lexsort((patterns[keep], row_ids[keep]))]
+
+    df_rules = pd.DataFrame({"antecedents": itemsets[ante_rows[keep]], "consequents": itemsets[cons_rows[keep]]})
+    for m in return_metrics:
+        df_rules[m] = values[m][keep]
+    return df_rules